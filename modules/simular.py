@@ -8,14 +8,21 @@ de intervenções urbanas, com foco em aprendizagem sobre ilhas de calor urbanas
 
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 from streamlit_folium import st_folium
 import folium
 from shapely.geometry import Polygon
 import json
+
+try:
+    import orjson
+except ImportError:  # opcional: encoder C ~3-10× mais rápido que json
+    orjson = None
 from utils import simulacao
-import time
+from dataclasses import dataclass
 from math import radians, sin, cos, sqrt, atan2
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Any
@@ -64,6 +71,28 @@ INFO_INTERVENCOES = {
     }
 }
 
+
+@dataclass(frozen=True, slots=True)
+class InterventionInfo:
+    '''Informações educativas pré-formatadas de um tipo de intervenção.'''
+    descricao: str
+    beneficios_md: str
+    exemplos_md: str
+    impacto: str
+
+
+# Versão imutável com listas já convertidas em markdown no import: cada card
+# renderiza benefícios/exemplos com um único st.markdown em vez de um loop
+INFO_INTERVENCOES_FROZEN = {
+    k: InterventionInfo(
+        descricao=v['descricao'],
+        beneficios_md='\n'.join(f'- {b}' for b in v.get('beneficios', [])),
+        exemplos_md='\n'.join(f'- {e}' for e in v.get('exemplos', [])),
+        impacto=v['impacto_teorico']
+    )
+    for k, v in INFO_INTERVENCOES.items()
+}
+
 # --- Novas Funções: Validação e Visualização de Resultados ---
 
 def validar_parametros_intervencao(tipo: str, parametros: Dict[str, Any]) -> Dict[str, Any]:
@@ -480,20 +509,122 @@ def visualizar_resultado_simulacao(
             fig_pizza.update_layout(height=400)
             st.plotly_chart(fig_pizza, use_container_width=True)
 
+# Paleta categórica fixa por tipo de intervenção: evita que o plotly.js
+# recompute mapeamentos de cor a cada render
+_TYPE_PALETTE = {
+    "Parque Urbano": "#2ca02c",
+    "Alteração de Albedo": "#bcbd22",
+    "Telhado Verde": "#98df8a",
+    "Pavimento Permeável": "#aec7e8",
+    "Expansão Urbana": "#d62728"
+}
+
+# Ilhas de calor simuladas (lat, lon, intensidade) — dados educativos fixos
+_HEAT_DATA = np.array([
+    [-23.55, -46.63, 0.9],  # Centro
+    [-23.56, -46.65, 0.7],  # Área comercial
+    [-23.54, -46.60, 0.6]   # Área residencial densa
+], dtype=np.float32)
+
+
+def _heat_layer() -> folium.FeatureGroup:
+    '''Camada de calor construída a partir dos dados fixos de _HEAT_DATA.
+
+    Construída por render, de propósito: add_to(m) reparenta o
+    FeatureGroup e o folium grava o nome do mapa pai no JS emitido —
+    um grupo cacheado e compartilhado entre sessões apontaria para o
+    mapa de outra sessão. Montar três círculos é barato; o que vale
+    cachear são os dados, já constantes no módulo.
+    '''
+    fg = folium.FeatureGroup(name='Camada de Calor')
+    for lat, lon, intensidade in _HEAT_DATA:
+        folium.Circle(
+            location=(float(lat), float(lon)),
+            radius=500,
+            color='red',
+            fill=True,
+            fillOpacity=float(intensidade) * 0.3,
+            popup=f"Área de calor intenso: {intensidade * 100:.0f}%"
+        ).add_to(fg)
+    return fg
+
+
+# --- Templates de Figuras Reutilizáveis ---
+# Figuras construídas uma única vez (layout, eixos, títulos); cada render
+# preenche os dados numa CÓPIA (go.Figure(template)) — o objeto cacheado é
+# compartilhado entre todas as sessões e não pode ser mutado no lugar
+
+@st.cache_resource
+def _template_barras_impacto() -> go.Figure:
+    '''Template do gráfico de barras de impacto por intervenção.'''
+    fig = go.Figure(go.Bar(texttemplate='%{y:+.2f}', textposition='outside'))
+    fig.update_layout(
+        title='Contribuição de Cada Intervenção para a Variação de Temperatura',
+        xaxis_title='Tipo de Intervenção',
+        yaxis_title='Variação de Temperatura (°C)',
+        height=400,
+        xaxis_tickangle=-45,
+        showlegend=False,
+        coloraxis={'colorscale': 'RdYlBu_r', 'showscale': False}
+    )
+    return fig
+
+
+@st.cache_resource
+def _template_pizzas_distribuicao() -> go.Figure:
+    '''Template único com as duas pizzas de distribuição lado a lado.'''
+    fig = make_subplots(
+        rows=1, cols=2,
+        specs=[[{'type': 'domain'}, {'type': 'domain'}]],
+        subplot_titles=('Áreas por Tipo', 'Impacto Térmico (Absoluto)')
+    )
+    fig.add_trace(go.Pie(hole=0.4), 1, 1)
+    fig.add_trace(go.Pie(hole=0.4), 1, 2)
+    fig.update_layout(title='Distribuição por Tipo de Intervenção', height=400)
+    return fig
+
+
+@st.cache_resource
+def _template_scatter_area_impacto() -> go.Figure:
+    '''Template do gráfico de dispersão área × impacto.'''
+    fig = go.Figure(go.Scatter(
+        mode='markers',
+        marker={'sizemode': 'area', 'line': {'width': 1, 'color': 'white'}}
+    ))
+    fig.update_layout(
+        title='Relação entre Área e Impacto Térmico',
+        xaxis_title='Área (m²)',
+        yaxis_title='Variação de Temperatura (°C)',
+        height=500,
+        showlegend=False
+    )
+    return fig
+
+
 # --- Funções de Inicialização ---
 
 def inicializar_session_state():
     '''Inicializa as variáveis de estado da sessão.'''
+    # Tupla imutável: salvar/carregar cenários compartilha a referência em vez
+    # de copiar a lista a cada operação
     if 'intervencoes' not in st.session_state:
-        st.session_state.intervencoes = []
+        st.session_state.intervencoes = ()
     if 'cenarios' not in st.session_state:
         st.session_state.cenarios = {}
     if 'poligonos_desenhados' not in st.session_state:
         st.session_state.poligonos_desenhados = []
+    if 'poligonos_desenhados_hashes' not in st.session_state:
+        st.session_state.poligonos_desenhados_hashes = set()
     if 'resultado_simulacao' not in st.session_state:
         st.session_state.resultado_simulacao = None
     if 'historico_simulacoes' not in st.session_state:
         st.session_state.historico_simulacoes = []
+    # DataFrame de comparação mantido incrementalmente: uma linha é anexada a
+    # cada simulação, em vez de reconstruir o agregado inteiro por render
+    if 'hist_df' not in st.session_state:
+        st.session_state.hist_df = pd.DataFrame(
+            columns=['Cenário', 'ΔT (°C)', 'Nº Intervenções', 'Área Total (m²)']
+        )
     if 'tutorial_ativo' not in st.session_state:
         st.session_state.tutorial_ativo = True
 
@@ -589,9 +720,9 @@ def renderizar_card_intervencao_melhorado(intervencao, index):
                 st.metric("Área", f"{area:,.0f} m²", help="Área total da intervenção")
                 
                 # Informações educativas
-                info = INFO_INTERVENCOES.get(intervencao['tipo'], {})
+                info = INFO_INTERVENCOES_FROZEN.get(intervencao['tipo'])
                 if info:
-                    st.caption(f"💡 {info['descricao']}")
+                    st.caption(f"💡 {info.descricao}")
             
             with col2:
                 parametros = intervencao.get('parametros', {})
@@ -604,23 +735,24 @@ def renderizar_card_intervencao_melhorado(intervencao, index):
             
             with col3:
                 if st.button("❌ Remover", key=f"remove_{index}"):
-                    st.session_state.intervencoes.pop(index)
+                    st.session_state.intervencoes = (
+                        st.session_state.intervencoes[:index]
+                        + st.session_state.intervencoes[index + 1:]
+                    )
                     st.rerun()
             
             # Detalhes expandidos
-            if intervencao['tipo'] in INFO_INTERVENCOES:
-                info = INFO_INTERVENCOES[intervencao['tipo']]
+            if intervencao['tipo'] in INFO_INTERVENCOES_FROZEN:
+                info = INFO_INTERVENCOES_FROZEN[intervencao['tipo']]
                 col_info1, col_info2 = st.columns(2)
-                
+
                 with col_info1:
                     st.markdown("**✅ Benefícios:**")
-                    for beneficio in info.get('beneficios', []):
-                        st.write(f"• {beneficio}")
-                
+                    st.markdown(info.beneficios_md)
+
                 with col_info2:
                     st.markdown("**🏛️ Exemplos Reais:**")
-                    for exemplo in info.get('exemplos', []):
-                        st.write(f"• {exemplo}")
+                    st.markdown(info.exemplos_md)
 
 def renderizar_formulario_nova_intervencao_melhorado():
     '''Renderiza o formulário com informações educativas.'''
@@ -714,14 +846,21 @@ def renderizar_formulario_nova_intervencao_melhorado():
                 "parametros": parametros,
                 "timestamp": pd.Timestamp.now().isoformat()
             }
-            st.session_state.intervencoes.append(nova_intervencao)
-            st.success(f"✅ Intervenção '{tipo_selecionado}' adicionada com sucesso!")
-            st.balloons()
-            time.sleep(1)
+            st.session_state.intervencoes = (*st.session_state.intervencoes, nova_intervencao)
+            # Toast não bloqueia o worker: o antigo time.sleep(1) segurava a
+            # thread do servidor por um segundo a cada intervenção adicionada
+            st.toast(f"✅ Intervenção '{tipo_selecionado}' adicionada com sucesso!", icon="✅")
             st.rerun()
 
+@st.fragment
 def renderizar_mapa_interativo_melhorado():
-    '''Renderiza o mapa interativo com camadas educativas.'''
+    '''
+    Renderiza o mapa interativo com camadas educativas.
+
+    Executa como fragmento: interações com o mapa (pan/zoom/desenho) rerodam
+    apenas esta função, não a página inteira. Lê/escreve em session_state:
+    poligonos_desenhados, poligonos_desenhados_hashes e intervencoes.
+    '''
     st.markdown("### 🗺️ Mapa de Intervenções")
     
     # Controles do mapa
@@ -733,7 +872,8 @@ def renderizar_mapa_interativo_melhorado():
     with col2:
         if st.button("🗑️ Limpar Áreas", help="Remove todas as áreas desenhadas"):
             st.session_state.poligonos_desenhados = []
-            st.rerun()
+            st.session_state.poligonos_desenhados_hashes = set()
+            st.rerun(scope="app")
     
     with col3:
         camada_calor = st.checkbox("🌡️ Camada de Calor", value=True, 
@@ -742,24 +882,9 @@ def renderizar_mapa_interativo_melhorado():
     # Criar mapa base
     m = folium.Map(location=[-23.55, -46.63], zoom_start=12)
     
-    # Adicionar camada de calor simulada (dados educativos)
+    # Adicionar camada de calor simulada (dados educativos fixos)
     if camada_calor:
-        # Simular áreas de maior temperatura (ilhas de calor)
-        heat_data = [
-            [-23.55, -46.63, 0.9],  # Centro
-            [-23.56, -46.65, 0.7],   # Área comercial
-            [-23.54, -46.60, 0.6]    # Área residencial densa
-        ]
-        
-        for point in heat_data:
-            folium.Circle(
-                location=point[:2],
-                radius=500,
-                color='red',
-                fill=True,
-                fillOpacity=point[2]*0.3,
-                popup=f"Área de calor intenso: {point[2]*100:.0f}%"
-            ).add_to(m)
+        _heat_layer().add_to(m)
     
     # Adicionar ferramenta de desenho
     folium.plugins.Draw(
@@ -808,22 +933,30 @@ def renderizar_mapa_interativo_melhorado():
                 # Calcular área aproximada
                 if len(coords) >= 3:
                     try:
+                        # Dedup O(1) pelas coordenadas: comparar os dicts inteiros
+                        # seria O(N·V) e nunca casava (timestamp sempre difere)
+                        coord_hash = hash(tuple(map(tuple, coords)))
+                        if coord_hash in st.session_state.poligonos_desenhados_hashes:
+                            continue
+
                         area_m2 = calcular_area_geografica(coords)
-                        
+
                         novo_poligono = {
                             'coordinates': coords,
                             'area_m2': area_m2,
                             'geometry': drawing['geometry'],
+                            'coord_hash': coord_hash,
                             'timestamp': pd.Timestamp.now().isoformat()
                         }
-                        
+
                         # Associar à última intervenção se existir
                         if st.session_state.intervencoes:
                             novo_poligono['intervencao_associada'] = st.session_state.intervencoes[-1]['tipo']
-                        
-                        if novo_poligono not in st.session_state.poligonos_desenhados:
-                            st.session_state.poligonos_desenhados.append(novo_poligono)
-                            st.rerun()
+
+                        st.session_state.poligonos_desenhados_hashes.add(coord_hash)
+                        st.session_state.poligonos_desenhados.append(novo_poligono)
+                        # A lista de áreas desenhadas vive fora do fragmento
+                        st.rerun(scope="app")
                     except Exception as e:
                         st.warning(f"Erro ao processar área desenhada: {e}")
 
@@ -842,8 +975,9 @@ def renderizar_gerenciamento_cenarios():
         
         if st.button("💾 Salvar Cenário Atual", type="secondary"):
             if nome_cenario and st.session_state.intervencoes:
+                # Tupla imutável: compartilhar a referência dispensa a cópia
                 st.session_state.cenarios[nome_cenario] = {
-                    'intervencoes': st.session_state.intervencoes.copy(),
+                    'intervencoes': st.session_state.intervencoes,
                     'timestamp': pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
                 }
                 st.success(f"✅ Cenário '{nome_cenario}' salvo com sucesso!")
@@ -860,7 +994,7 @@ def renderizar_gerenciamento_cenarios():
             
             if st.button("📂 Carregar Cenário", type="secondary"):
                 if cenario_selecionado:
-                    st.session_state.intervencoes = st.session_state.cenarios[cenario_selecionado]['intervencoes'].copy()
+                    st.session_state.intervencoes = st.session_state.cenarios[cenario_selecionado]['intervencoes']
                     st.success(f"✅ Cenário '{cenario_selecionado}' carregado!")
                     st.rerun()
 
@@ -876,10 +1010,11 @@ def renderizar_simulacao_e_resultados_melhorado():
     
     with col1:
         st.markdown("**📋 Resumo das Intervenções:**")
-        for i, interv in enumerate(st.session_state.intervencoes):
-            tipo = interv.get('tipo', 'Tipo não definido')
-            area = interv.get('area_m2', 0)
-            st.write(f"• {tipo} ({area:,.0f} m²)")
+        # Um único st.markdown em vez de um st.write por intervenção
+        st.markdown('\n'.join(
+            f"- {interv.get('tipo', 'Tipo não definido')} ({interv.get('area_m2', 0):,.0f} m²)"
+            for interv in st.session_state.intervencoes
+        ))
         
         nome_simulacao = st.text_input("Nome da Simulação", value=f"Simulação {len(st.session_state.historico_simulacoes) + 1}")
         
@@ -943,6 +1078,14 @@ def renderizar_simulacao_e_resultados_melhorado():
                     'timestamp': pd.Timestamp.now().isoformat()
                 })
 
+                # Atualização O(1) do DataFrame de comparação do histórico
+                st.session_state.hist_df.loc[len(st.session_state.hist_df)] = (
+                    nome_simulacao,
+                    delta_total,
+                    len(intervencoes_validadas),
+                    sum(i['area_m2'] for i in intervencoes_validadas)
+                )
+
                 st.rerun()
 
             except Exception as e:
@@ -991,8 +1134,14 @@ def renderizar_simulacao_e_resultados_melhorado():
                 - Considere adicionar medidas de resfriamento
                 """)
 
+@st.fragment
 def renderizar_visualizacoes_avancadas_melhorado():
-    '''Renderiza gráficos e análises educativas.'''
+    '''
+    Renderiza gráficos e análises educativas.
+
+    Fragmento: interações nos gráficos não rerodam a página inteira.
+    Lê em session_state: resultado_simulacao e intervencoes.
+    '''
     if not st.session_state.resultado_simulacao:
         return
 
@@ -1016,23 +1165,19 @@ def renderizar_visualizacoes_avancadas_melhorado():
     tab1, tab2, tab3, tab4 = st.tabs(["📈 Impacto por Intervenção", "🥧 Distribuição", "🌡️ Comparativo", "📋 Tabela Detalhada"])
     
     with tab1:
-        # Gráfico de barras com cores significativas
-        fig_barras = px.bar(
-            df_resumo,
-            x='tipo',
-            y='impacto_ponderado',
-            title='Contribuição de Cada Intervenção para a Variação de Temperatura',
-            labels={'impacto_ponderado': 'Variação de Temperatura (°C)', 'tipo': 'Tipo de Intervenção'},
-            color='impacto_ponderado',
-            color_continuous_scale='RdYlBu_r',
-            text_auto='.2f'
+        # Gráfico de barras com cores significativas: template cacheado,
+        # só os dados são atualizados por render
+        impactos = df_resumo['impacto_ponderado'].to_numpy()
+        # Cores amostradas no servidor, uma vez por resultado: o plotly.js
+        # recebe strings prontas em vez de interpolar a escala contínua
+        amplitude = np.ptp(impactos) or 1.0
+        cores = px.colors.sample_colorscale(
+            'RdYlBu_r', ((impactos - impactos.min()) / amplitude).tolist()
         )
-        fig_barras.update_layout(
-            height=400,
-            xaxis_tickangle=-45,
-            showlegend=False
-        )
-        fig_barras.update_traces(textposition='outside')
+        fig_barras = go.Figure(_template_barras_impacto())  # cópia por sessão
+        fig_barras.data[0].x = df_resumo['tipo'].to_numpy()
+        fig_barras.data[0].y = impactos
+        fig_barras.data[0].marker = {'color': cores}
         st.plotly_chart(fig_barras, use_container_width=True)
         
         # Análise do gráfico
@@ -1044,47 +1189,27 @@ def renderizar_visualizacoes_avancadas_melhorado():
             st.write(f"- **Área total intervencionada**: {df_resumo['area_m2'].sum():,.0f} m²")
     
     with tab2:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Gráfico de pizza - Distribuição de áreas
-            fig_pizza_area = px.pie(
-                df_resumo,
-                values='area_m2',
-                names='tipo',
-                title='Distribuição de Áreas por Tipo de Intervenção',
-                hole=0.4
-            )
-            fig_pizza_area.update_layout(height=400)
-            st.plotly_chart(fig_pizza_area, use_container_width=True)
-        
-        with col2:
-            # Gráfico de pizza - Distribuição de impacto
-            df_impacto_abs = df_resumo.copy()
-            df_impacto_abs['impacto_abs'] = df_impacto_abs['impacto_ponderado'].abs()
-            
-            fig_pizza_impacto = px.pie(
-                df_impacto_abs,
-                values='impacto_abs',
-                names='tipo',
-                title='Distribuição do Impacto Térmico (Absoluto)',
-                hole=0.4
-            )
-            fig_pizza_impacto.update_layout(height=400)
-            st.plotly_chart(fig_pizza_impacto, use_container_width=True)
+        # Uma figura só com as duas pizzas: um payload, uma montagem plotly.js
+        tipos = df_resumo['tipo'].to_numpy()
+        fig_pizzas = go.Figure(_template_pizzas_distribuicao())  # cópia por sessão
+        fig_pizzas.data[0].labels = tipos
+        fig_pizzas.data[0].values = df_resumo['area_m2'].to_numpy()
+        fig_pizzas.data[1].labels = tipos
+        fig_pizzas.data[1].values = df_resumo['impacto_ponderado'].abs().to_numpy()
+        st.plotly_chart(fig_pizzas, use_container_width=True)
     
     with tab3:
         # Gráfico de comparação área vs impacto
-        fig_scatter = px.scatter(
-            df_resumo,
-            x='area_m2',
-            y='impacto_ponderado',
-            size='area_m2',
-            color='tipo',
-            title='Relação entre Área e Impacto Térmico',
-            labels={'area_m2': 'Área (m²)', 'impacto_ponderado': 'Variação de Temperatura (°C)'}
-        )
-        fig_scatter.update_layout(height=500)
+        areas = df_resumo['area_m2'].to_numpy()
+        fig_scatter = go.Figure(_template_scatter_area_impacto())  # cópia por sessão
+        fig_scatter.data[0].x = areas
+        fig_scatter.data[0].y = df_resumo['impacto_ponderado'].to_numpy()
+        fig_scatter.data[0].text = df_resumo['tipo'].to_numpy()
+        fig_scatter.data[0].marker.color = [
+            _TYPE_PALETTE.get(t, '#1f77b4') for t in df_resumo['tipo']
+        ]
+        fig_scatter.data[0].marker.size = areas
+        fig_scatter.data[0].marker.sizeref = 2.0 * areas.max() / (40.0 ** 2) if len(areas) else 1.0
         st.plotly_chart(fig_scatter, use_container_width=True)
         
         # Análise de eficiência
@@ -1099,35 +1224,22 @@ def renderizar_visualizacoes_avancadas_melhorado():
         st.markdown("**📋 Detalhamento por Intervenção:**")
         df_display = df_resumo[['tipo', 'area_m2', 'impacto_individual', 'peso_aplicado', 'impacto_ponderado']].copy()
         df_display.columns = ['Tipo', 'Área (m²)', 'Impacto Individual (°C)', 'Peso', 'Impacto Ponderado (°C)']
-        df_display['Área (m²)'] = df_display['Área (m²)'].apply(lambda x: f"{x:,.0f}")
-        df_display['Impacto Ponderado (°C)'] = df_display['Impacto Ponderado (°C)'].apply(lambda x: f"{x:+.3f}")
-        
+
+        # Styler.format formata em nível C e mantém as colunas numéricas
+        # (payload Arrow menor, ordenação correta no navegador)
         st.dataframe(
-            df_display,
+            df_display.style.format({
+                'Área (m²)': '{:,.0f}',
+                'Impacto Individual (°C)': '{:+.3f}',
+                'Impacto Ponderado (°C)': '{:+.3f}'
+            }),
             use_container_width=True,
             hide_index=True
         )
 
-def renderizar_historico_comparativo():
-    '''Renderiza comparação entre simulações do histórico.'''
-    if len(st.session_state.historico_simulacoes) < 2:
-        return
-    
-    st.markdown("### 📚 Comparativo do Histórico")
-    
-    # Preparar dados para comparação
-    dados_comparacao = []
-    for sim in st.session_state.historico_simulacoes:
-        dados_comparacao.append({
-            'Cenário': sim['cenario'],
-            'ΔT (°C)': sim['resultado']['delta_total'],
-            'Nº Intervenções': len(sim['intervencoes']),
-            'Área Total (m²)': sum([i['area_m2'] for i in sim['intervencoes']])
-        })
-    
-    df_comparacao = pd.DataFrame(dados_comparacao)
-    
-    # Gráfico de comparação
+@st.cache_data
+def _build_hist_fig(df_comparacao: pd.DataFrame) -> go.Figure:
+    '''Constrói o gráfico de comparação do histórico (cacheado por conteúdo).'''
     fig_comparacao = px.bar(
         df_comparacao,
         x='Cenário',
@@ -1138,41 +1250,78 @@ def renderizar_historico_comparativo():
         text_auto='.2f'
     )
     fig_comparacao.update_layout(height=400)
-    st.plotly_chart(fig_comparacao, use_container_width=True)
-    
+    return fig_comparacao
+
+
+@st.fragment
+def renderizar_historico_comparativo():
+    '''
+    Renderiza comparação entre simulações do histórico.
+
+    Fragmento: lê apenas session_state.historico_simulacoes; hovers e
+    interações na tabela/gráfico não recomputam o restante da página.
+    '''
+    if len(st.session_state.historico_simulacoes) < 2:
+        return
+
+    st.markdown("### 📚 Comparativo do Histórico")
+
+    # DataFrame mantido incrementalmente em inicializar_session_state /
+    # renderizar_simulacao_e_resultados_melhorado — nada a reagregar aqui
+    df_comparacao = st.session_state.hist_df
+
+    # Gráfico de comparação
+    st.plotly_chart(_build_hist_fig(df_comparacao), use_container_width=True)
+
     # Tabela comparativa
     st.dataframe(df_comparacao, use_container_width=True)
 
+@st.cache_data
+def _csv_export(resumo_detalhado: List[Dict]) -> bytes:
+    '''Serializa o resumo detalhado em CSV (no máximo uma vez por resultado).'''
+    return pd.DataFrame(resumo_detalhado).to_csv(index=False).encode()
+
+
+@st.cache_data
+def _json_export(resultado: Dict[str, Any]) -> str:
+    '''Serializa o resultado completo em JSON (no máximo uma vez por resultado).'''
+    if orjson is not None:
+        return orjson.dumps(
+            resultado,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    return json.dumps(resultado, indent=2)
+
+
 def renderizar_exportacao():
     '''Renderiza opções de exportação dos resultados.'''
     if not st.session_state.resultado_simulacao:
         return
-    
+
     st.markdown("### 📤 Exportar Resultados")
-    
+
+    resultado = st.session_state.resultado_simulacao
     col1, col2, col3 = st.columns(3)
-    
+
+    # Botões de download diretos: um clique, serialização cacheada por resultado
     with col1:
-        if st.button("📊 Exportar CSV", use_container_width=True):
-            df_resumo = pd.DataFrame(st.session_state.resultado_simulacao['resumo_detalhado'])
-            csv = df_resumo.to_csv(index=False)
-            st.download_button(
-                label="⬇️ Baixar CSV",
-                data=csv,
-                file_name="simulacao_clima_urbano.csv",
-                mime="text/csv"
-            )
-    
+        st.download_button(
+            label="⬇️ Baixar CSV",
+            data=_csv_export(resultado['resumo_detalhado']),
+            file_name="simulacao_clima_urbano.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+
     with col2:
-        if st.button("📋 Exportar JSON", use_container_width=True):
-            json_data = json.dumps(st.session_state.resultado_simulacao, indent=2)
-            st.download_button(
-                label="⬇️ Baixar JSON",
-                data=json_data,
-                file_name="simulacao_clima_urbano.json",
-                mime="application/json"
-            )
-    
+        st.download_button(
+            label="⬇️ Baixar JSON",
+            data=_json_export(resultado),
+            file_name="simulacao_clima_urbano.json",
+            mime="application/json",
+            use_container_width=True
+        )
+
     with col3:
         if st.button("📄 Gerar Relatório", use_container_width=True):
             st.info("🚧 Funcionalidade de relatório em desenvolvimento.")
@@ -1198,10 +1347,17 @@ def renderizar_pagina():
     with col4:
         st.metric("Simulações Realizadas", len(st.session_state.historico_simulacoes))
     
-    # Layout principal em abas
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["🏗️ Intervenções", "🗺️ Mapa", "🚀 Simular", "📊 Resultados", "📚 Histórico"])
-    
-    with tab1:
+    # Layout principal em abas "preguiçosas": st.tabs executa o corpo de
+    # todas as abas a cada rerun; o radio renderiza só a seção selecionada
+    aba_ativa = st.radio(
+        "Seção",
+        ["🏗️ Intervenções", "🗺️ Mapa", "🚀 Simular", "📊 Resultados", "📚 Histórico"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="active_tab"
+    )
+
+    if aba_ativa == "🏗️ Intervenções":
         if st.session_state.intervencoes:
             st.markdown("### 📋 Intervenções Configuradas")
             for i, intervencao in enumerate(st.session_state.intervencoes):
@@ -1213,39 +1369,55 @@ def renderizar_pagina():
         st.markdown("---")
         renderizar_gerenciamento_cenarios()
     
-    with tab2:
+    elif aba_ativa == "🗺️ Mapa":
         renderizar_mapa_interativo_melhorado()
-        
+
         if st.session_state.poligonos_desenhados:
-            st.markdown("**🗺️ Áreas Desenhadas:**")
-            for i, poly in enumerate(st.session_state.poligonos_desenhados):
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"**Área {i+1}**: {poly['area_m2']:,.0f} m²")
-                    if 'intervencao_associada' in poly:
-                        st.caption(f"Associada à: {poly['intervencao_associada']}")
-                with col2:
-                    if st.button("🗑️", key=f"del_poly_{i}"):
-                        st.session_state.poligonos_desenhados.pop(i)
-                        st.rerun()
+            st.markdown("**🗺️ Áreas Desenhadas:** (exclua linhas para remover áreas)")
+            # Editor único em vez de um botão por polígono: evita registrar
+            # N callbacks a cada rerun
+            df_areas = pd.DataFrame([
+                {
+                    'Área': f"Área {i + 1}",
+                    'Área (m²)': poly['area_m2'],
+                    'Intervenção': poly.get('intervencao_associada', '—')
+                }
+                for i, poly in enumerate(st.session_state.poligonos_desenhados)
+            ])
+            df_editado = st.data_editor(
+                df_areas,
+                num_rows='dynamic',
+                hide_index=True,
+                disabled=['Área', 'Área (m²)', 'Intervenção'],
+                use_container_width=True,
+                key='poly_editor'
+            )
+            if len(df_editado) < len(df_areas):
+                mantidos = [st.session_state.poligonos_desenhados[i] for i in df_editado.index]
+                st.session_state.poligonos_desenhados = mantidos
+                st.session_state.poligonos_desenhados_hashes = {
+                    poly['coord_hash'] for poly in mantidos if 'coord_hash' in poly
+                }
+                st.rerun()
     
-    with tab3:
+    elif aba_ativa == "🚀 Simular":
         renderizar_simulacao_e_resultados_melhorado()
-    
-    with tab4:
+
+    elif aba_ativa == "📊 Resultados":
         if st.session_state.resultado_simulacao:
             renderizar_visualizacoes_avancadas_melhorado()
             renderizar_exportacao()
         else:
             st.info("🚀 Execute uma simulação na aba 'Simular' para ver resultados detalhados")
-    
-    with tab5:
+
+    elif aba_ativa == "📚 Histórico":
         if st.session_state.historico_simulacoes:
             renderizar_historico_comparativo()
             
             # Opção para limpar histórico
             if st.button("🗑️ Limpar Histórico de Simulações", type="secondary"):
                 st.session_state.historico_simulacoes = []
+                st.session_state.hist_df = st.session_state.hist_df.iloc[0:0]
                 st.rerun()
         else:
             st.info("📚 O histórico de simulações aparecerá aqui após múltiplas execuções")
\ No newline at end of file
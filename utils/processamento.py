@@ -1,15 +1,36 @@
 # utils/processamento.py
 
+import functools
+
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point, Polygon
+import pyproj
+import shapely
+from shapely import STRtree
+from shapely.geometry import Polygon
 import streamlit as st
 
+# Transformer reutilizável WGS84 -> UTM 23S (área em metros para São Paulo)
+_TRANSFORMER_UTM23S = pyproj.Transformer.from_crs(4326, 32723, always_xy=True)
+
+try:
+    import pyogrio  # leitor vetorial opcional: caminho Arrow colunar,
+                    # várias vezes mais rápido que Fiona para GeoJSON
+except ImportError:
+    pyogrio = None
+
+def _read_vector(caminho):
+    """Lê um arquivo vetorial preferindo o caminho Arrow do pyogrio."""
+    if pyogrio is not None:
+        return pyogrio.read_dataframe(caminho, use_arrow=True)
+    return gpd.read_file(caminho)
+
 def carregar_dados_base(caminho_zcl, caminho_temp):
     """Carrega os arquivos GeoJSON base em GeoDataFrames."""
     try:
-        gdf_zcl = gpd.read_file(caminho_zcl)
-        gdf_temp = gpd.read_file(caminho_temp)
+        gdf_zcl = _read_vector(caminho_zcl)
+        gdf_temp = _read_vector(caminho_temp)
         return gdf_zcl, gdf_temp, None
     except Exception as e:
         return None, None, f"Erro ao carregar dados base: {e}. Verifique se os arquivos estão na pasta 'data/'."
@@ -20,22 +41,32 @@ def validar_e_processar_csv(arquivo_carregado):
     e o converte para um GeoDataFrame de pontos.
     """
     try:
-        df = pd.read_csv(arquivo_carregado)
-        
-        # Tenta encontrar colunas de latitude, longitude e valor (insensível a maiúsculas/minúsculas)
-        lat_col = None
-        lon_col = None
-        val_col = None
-        
-        for col in df.columns:
-            col_lower = col.lower()
-            if 'lat' in col_lower and lat_col is None:
-                lat_col = col
-            elif 'lon' in col_lower and lon_col is None:
-                lon_col = col
-            elif any(v in col_lower for v in ['val', 'temp', 'medida', 'valor']) and val_col is None:
-                val_col = col
-        
+        # Parser multithread/SIMD do PyArrow (já presente via Streamlit);
+        # se o arquivo usar algo que o engine não cobre, volta ao padrão
+        try:
+            df = pd.read_csv(arquivo_carregado, engine="pyarrow")
+        except Exception:
+            arquivo_carregado.seek(0)
+            df = pd.read_csv(arquivo_carregado)
+
+        # Tenta encontrar colunas de latitude, longitude e valor (insensível
+        # a maiúsculas/minúsculas), preferindo nomes exatos a substrings —
+        # assim 'lat' ganha de 'latitude_estimada' quando ambos existem
+        cols = pd.Index(df.columns)
+        lower = cols.str.lower()
+
+        def _detectar_coluna(padrao_exato, padrao_parcial):
+            exatas = cols[lower.str.match(padrao_exato)]
+            if len(exatas) > 0:
+                return exatas[0]
+            parciais = cols[lower.str.contains(padrao_parcial)]
+            return parciais[0] if len(parciais) > 0 else None
+
+        lat_col = _detectar_coluna(r'^lat(itude)?$', 'lat')
+        lon_col = _detectar_coluna(r'^lon(gitude)?$', 'lon')
+        val_col = _detectar_coluna(r'^(val(or)?|temp(eratura)?|medida)$',
+                                   'val|temp|medida')
+
         if not all([lat_col, lon_col, val_col]):
             return None, "Não foi possível encontrar colunas de 'latitude', 'longitude' e 'valor' no arquivo. Verifique se as colunas têm nomes apropriados."
 
@@ -43,20 +74,27 @@ def validar_e_processar_csv(arquivo_carregado):
         df = df.rename(columns={lat_col: 'latitude', lon_col: 'longitude', val_col: 'valor'})
 
         # Converte para numérico, forçando erros a se tornarem NaN
-        df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
-        df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
-        df['valor'] = pd.to_numeric(df['valor'], errors='coerce')
+        colunas_essenciais = ['latitude', 'longitude', 'valor']
+        for col in colunas_essenciais:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
 
-        # Remove linhas com valores nulos nas colunas essenciais
+        # Remove linhas com valores nulos nas colunas essenciais — máscara
+        # única em C sobre o bloco float, sem o passe coluna a coluna (com
+        # cópia inplace) do dropna
         df_original_len = len(df)
-        df.dropna(subset=['latitude', 'longitude', 'valor'], inplace=True)
+        validos = ~np.isnan(df[colunas_essenciais].to_numpy(dtype=float)).any(axis=1)
+        if not validos.all():
+            df = df[validos]
 
-        if df.empty:
+        if len(df) == 0:
             return None, "Nenhuma linha válida encontrada no arquivo após a limpeza. Verifique os dados."
 
-        # Cria geometrias de ponto
-        geometry = [Point(xy) for xy in zip(df['longitude'], df['latitude'])]
-        gdf_pontos = gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
+        # Cria geometrias de ponto em um único loop C vetorizado, em vez
+        # de um objeto Point por linha no interpretador
+        geometry = gpd.points_from_xy(
+            df['longitude'].to_numpy(), df['latitude'].to_numpy(), crs="EPSG:4326"
+        )
+        gdf_pontos = gpd.GeoDataFrame(df, geometry=geometry)
         
         linhas_removidas = df_original_len - len(df)
         mensagem_sucesso = f"{len(gdf_pontos)} pontos carregados com sucesso!"
@@ -68,11 +106,23 @@ def validar_e_processar_csv(arquivo_carregado):
     except Exception as e:
         return None, f"Erro inesperado ao processar o arquivo: {e}"
 
+@functools.lru_cache(maxsize=16)
+def _poligono_area(coords_tuple):
+    """Reconstrói (e prepara) o polígono da área desenhada uma única vez.
+
+    A mesma área é reaproveitada em vários filtros durante a sessão; com o
+    cache, os reruns não repagam a construção do shapely.Polygon, e a
+    geometria preparada acelera os predicados within subsequentes.
+    """
+    poly = Polygon(coords_tuple)
+    shapely.prepare(poly)
+    return poly
+
 def filtrar_dados_por_area(gdf, area_de_interesse_geojson):
     """
     Filtra um GeoDataFrame para manter apenas o que está dentro da 'area_de_interesse'.
     """
-    if not area_de_interesse_geojson or gdf.empty:
+    if not area_de_interesse_geojson or len(gdf) == 0:
         return gdf # Se não há área ou dados, retorna todos os dados
 
     try:
@@ -82,47 +132,122 @@ def filtrar_dados_por_area(gdf, area_de_interesse_geojson):
         else:
             return gdf.iloc[0:0]  # Retorna GDF vazio se não for polígono
             
-        poly = Polygon(coords)
+        poly = _poligono_area(tuple(map(tuple, coords)))
+
+        # Para camadas de pontos basta um teste de pertencimento: o filtro
+        # barato pelo bbox poda a maioria das feições e o within decide o
+        # resto, sem alocar geometrias recortadas como faz o gpd.clip
+        if (gdf.geom_type == 'Point').all():
+            minx, miny, maxx, maxy = poly.bounds
+            candidatos = gdf.cx[minx:maxx, miny:maxy]
+            return candidatos[candidatos.within(poly)]
+
+        # Polígonos/linhas precisam do recorte geométrico de verdade
         area_gdf = gpd.GeoDataFrame([1], geometry=[poly], crs="EPSG:4326")
         dados_filtrados = gpd.clip(gdf, area_gdf)
+
+        # O recorte muda as geometrias, mas mantém as colunas de atributo:
+        # áreas pré-calculadas ficariam maiores que os polígonos recortados
+        # e enganariam o atalho de calcular_estatisticas_area — recalcula
+        if 'area_km2' in dados_filtrados.columns and len(dados_filtrados) > 0:
+            dados_filtrados['area_km2'] = (
+                _areas_m2_utm(dados_filtrados.geometry.values) / 1_000_000
+            )
         return dados_filtrados
     except Exception as e:
         st.error(f"Erro ao filtrar dados por área: {e}")
         return gdf.iloc[0:0]  # Retorna GDF vazio em caso de erro
 
-def juntar_dados_espaciais(pontos_usuario, gdf_zcl):
+def _obter_indice_zcl(gdf_zcl):
+    """Constrói (uma vez por sessão) a STRtree das geometrias das ZCLs."""
+    chave = id(gdf_zcl)
+    if st.session_state.get('zcl_tree_key') != chave:
+        st.session_state['zcl_tree'] = STRtree(gdf_zcl.geometry.values)
+        st.session_state['zcl_tree_key'] = chave
+    return st.session_state['zcl_tree']
+
+def juntar_dados_espaciais(pontos_usuario, gdf_zcl, drop_na=False):
     """
     Junta espacialmente os pontos do usuário com as ZCLs.
+
+    Com drop_na=True o join é "inner" e retorna apenas os pontos dentro de
+    alguma ZCL, dispensando o dropna(subset=['zcl_classe']) no consumidor.
+    O índice espacial das ZCLs é reaproveitado entre reruns via
+    st.session_state, em vez de ser reconstruído pelo sjoin a cada chamada.
     """
-    if pontos_usuario.empty or gdf_zcl.empty:
+    if len(pontos_usuario) == 0 or len(gdf_zcl) == 0:
         return pontos_usuario
-    
+
     try:
-        # Realiza o spatial join
-        pontos_com_zcl = gpd.sjoin(pontos_usuario, gdf_zcl, how="left", predicate="within")
-        return pontos_com_zcl
+        tree = _obter_indice_zcl(gdf_zcl)
+        idx_pts, idx_zcl = tree.query(pontos_usuario.geometry.values, predicate="within")
+
+        pontos_com_zcl = pontos_usuario.iloc[idx_pts].copy()
+        atributos = gdf_zcl.drop(columns=gdf_zcl.geometry.name)
+        for col in atributos.columns:
+            pontos_com_zcl[col] = atributos[col].to_numpy()[idx_zcl]
+        pontos_com_zcl['index_right'] = gdf_zcl.index.to_numpy()[idx_zcl]
+
+        if drop_na:
+            return pontos_com_zcl
+
+        # Join "left": reinclui os pontos fora de qualquer ZCL (atributos NaN)
+        fora = np.setdiff1d(np.arange(len(pontos_usuario)), idx_pts)
+        if len(fora) == 0:
+            return pontos_com_zcl.sort_index()
+        return pd.concat([pontos_com_zcl, pontos_usuario.iloc[fora]]).sort_index()
     except Exception as e:
         st.error(f"Erro ao juntar dados espaciais: {e}")
         return pontos_usuario
 
+def _areas_m2_utm(geometrias):
+    """Áreas em m² projetando só as coordenadas para UTM 23S.
+
+    Evita o to_crs, que reconstrói o GeoDataFrame inteiro: o Transformer
+    converte cada array de vértices de uma vez e shapely.area mede em C,
+    respeitando buracos e multipolígonos.
+    """
+    def _proj(coords):
+        x, y = _TRANSFORMER_UTM23S.transform(coords[:, 0], coords[:, 1])
+        return np.column_stack([x, y])
+
+    return shapely.area(shapely.transform(geometrias, _proj))
+
 def calcular_estatisticas_area(gdf_zcl_filtrado):
     """
     Calcula estatísticas básicas sobre a composição de ZCL em uma área.
     """
-    if gdf_zcl_filtrado.empty:
+    if len(gdf_zcl_filtrado) == 0:
         return {}
     
     try:
-        # Calcula a área em um CRS projetado para obter valores em m²
-        gdf_proj = gdf_zcl_filtrado.to_crs(epsg=32723)  # UTM Zone 23S para São Paulo
-        gdf_proj['area_m2'] = gdf_proj.geometry.area
-        
+        if 'area_km2' in gdf_zcl_filtrado.columns:
+            # Áreas já calculadas na geração do mapa: dispensa reprojetar
+            # todos os vértices via PROJ a cada chamada
+            areas_m2 = gdf_zcl_filtrado['area_km2'] * 1_000_000
+        else:
+            # Projeta apenas os arrays de coordenadas (PROJ em lote, sem
+            # reconstruir o GeoDataFrame via to_crs) e mede com o GEOS
+            areas_m2 = pd.Series(
+                _areas_m2_utm(gdf_zcl_filtrado.geometry.values),
+                index=gdf_zcl_filtrado.index,
+            )
+
         # Agrupa por classe de ZCL
-        stats = gdf_proj.groupby('zcl_classe')['area_m2'].agg(['sum', 'count']).reset_index()
-        stats['percentual'] = (stats['sum'] / stats['sum'].sum()) * 100
-        
+        stats = (
+            areas_m2.groupby(gdf_zcl_filtrado['zcl_classe'])
+            .agg(['sum', 'count'])
+            .reset_index()
+        )
+        total_area_m2 = stats['sum'].sum()
+        stats['percentual'] = (stats['sum'] / total_area_m2) * 100
+        # Valores derivados calculados uma vez aqui, para os consumidores
+        # não repetirem as divisões a cada renderização
+        stats['area_km2'] = stats['sum'] / 1_000_000
+
         return {
-            'total_area_m2': stats['sum'].sum(),
+            'total_area_m2': total_area_m2,
+            'total_area_km2': total_area_m2 / 1_000_000,
             'composicao': stats.to_dict('records'),
             'num_classes': len(stats)
         }
@@ -8,7 +8,11 @@ e funcionalidades educativas.
 '''
 
 import numpy as np
-import pandas as pd
+
+try:
+    import numba  # aceleração opcional: sem ela o núcleo roda em Python puro
+except ImportError:
+    numba = None
 
 # --- COEFICIENTES BASEADOS EM LITERATURA CIENTÍFICA ---
 # Valores calibrados com base em estudos de ilha de calor urbana
@@ -25,55 +29,132 @@ FATORES_BASE = {
 # Fatores de escala para conversão de área
 FATOR_AREA = 1.0 / 1000000  # Converter m² para km²
 
+# Códigos inteiros por tipo, usados pelos caminhos vetorizados
+_TIPO_CODIGO = {
+    "Parque Urbano": 0,
+    "Alteração de Albedo": 1,
+    "Telhado Verde": 2,
+    "Pavimento Permeável": 3,
+    "Expansão Urbana": 4,
+}
+
 # --- FUNÇÕES AUXILIARES EDUCATIVAS ---
 
-def explicar_impacto(tipo_intervencao, parametros, area_m2, resultado):
-    '''Gera explicação educativa para o resultado da simulação.'''
-    explicacoes = {
-        "Parque Urbano": f"""
+# Templates pré-compilados das explicações — formatados um por vez
+_EXPL_TEMPLATES = {
+    "Parque Urbano": """
         **Mecanismo de resfriamento**: Evapotranspiração e sombreamento
-        - Área vegetada: {area_m2:,.0f} m²
-        - Densidade da vegetação: {parametros.get('densidade', 0):.1f}
+        - Área vegetada: {area:,.0f} m²
+        - Densidade da vegetação: {densidade:.1f}
         - Efeito estimado: {resultado:.3f}°C de resfriamento
         """,
-        
-        "Alteração de Albedo": f"""
+
+    "Alteração de Albedo": """
         **Mecanismo de resfriamento**: Aumento da reflexão de radiação solar
-        - Albedo original: {parametros.get('albedo_original', 0):.2f}
-        - Novo albedo: {parametros.get('novo_albedo', 0):.2f}
-        - Melhoria: +{(parametros.get('novo_albedo', 0) - parametros.get('albedo_original', 0)):.2f}
+        - Albedo original: {original:.2f}
+        - Novo albedo: {novo:.2f}
+        - Melhoria: +{melhoria:.2f}
         - Efeito estimado: {resultado:.3f}°C de resfriamento
         """,
-        
-        "Telhado Verde": f"""
+
+    "Telhado Verde": """
         **Mecanismo de resfriamento**: Isolamento térmico e evapotranspiração
-        - Área de telhado: {area_m2:,.0f} m²
-        - Cobertura verde: {parametros.get('cobertura', 0)*100:.0f}%
+        - Área de telhado: {area:,.0f} m²
+        - Cobertura verde: {cobertura:.0f}%
         - Efeito estimado: {resultado:.3f}°C de resfriamento
         """,
-        
-        "Pavimento Permeável": f"""
+
+    "Pavimento Permeável": """
         **Mecanismo de resfriamento**: Evaporação da água infiltrada
-        - Área permeabilizada: {area_m2:,.0f} m²
-        - Taxa de permeabilidade: {parametros.get('permeabilidade', 0)*100:.0f}%
+        - Área permeabilizada: {area:,.0f} m²
+        - Taxa de permeabilidade: {permeabilidade:.0f}%
         - Efeito estimado: {resultado:.3f}°C de resfriamento
         """,
-        
-        "Expansão Urbana": f"""
+
+    "Expansão Urbana": """
         **Mecanismo de aquecimento**: Aumento de superfícies impermeáveis e calor antropogênico
-        - Área urbanizada: {area_m2:,.0f} m²
-        - Intensidade construtiva: {parametros.get('fator_construcao', 0)*100:.0f}%
+        - Área urbanizada: {area:,.0f} m²
+        - Intensidade construtiva: {fator:.0f}%
         - Efeito estimado: {resultado:+.3f}°C de aquecimento
         """
-    }
-    
-    return explicacoes.get(tipo_intervencao, "Intervenção não reconhecida.")
+}
+
+def explicar_impacto(tipo_intervencao, parametros, area_m2, resultado):
+    '''Gera explicação educativa para o resultado da simulação.
+
+    Formata apenas o template do tipo pedido — a versão anterior montava
+    as cinco f-strings inteiras para devolver uma.
+    '''
+    template = _EXPL_TEMPLATES.get(tipo_intervencao)
+    if template is None:
+        return "Intervenção não reconhecida."
+
+    if tipo_intervencao == "Parque Urbano":
+        return template.format(area=area_m2, resultado=resultado,
+                               densidade=parametros.get('densidade', 0))
+    if tipo_intervencao == "Alteração de Albedo":
+        original = parametros.get('albedo_original', 0)
+        novo = parametros.get('novo_albedo', 0)
+        return template.format(original=original, novo=novo,
+                               melhoria=novo - original, resultado=resultado)
+    if tipo_intervencao == "Telhado Verde":
+        return template.format(area=area_m2, resultado=resultado,
+                               cobertura=parametros.get('cobertura', 0) * 100)
+    if tipo_intervencao == "Pavimento Permeável":
+        return template.format(area=area_m2, resultado=resultado,
+                               permeabilidade=parametros.get('permeabilidade', 0) * 100)
+    return template.format(area=area_m2, resultado=resultado,
+                           fator=parametros.get('fator_construcao', 0) * 100)
+
+def _validador_faixa(nome_param, msg_erro, limiar_alerta=None, msg_alerta=None,
+                     alerta_acima=False):
+    '''Fábrica de validadores de faixa 0–1 com alerta didático opcional.
+
+    O nome do parâmetro, as mensagens e o limiar ficam ligados via
+    closure: cada tipo ganha uma função especializada, consultada por
+    tabela em vez da cascata de elifs sobre strings.
+    '''
+    def validador(parametros, erros, alertas):
+        valor = parametros.get(nome_param, 0)
+        if not 0 <= valor <= 1:
+            erros.append(msg_erro)
+        elif limiar_alerta is not None:
+            if valor > limiar_alerta if alerta_acima else valor < limiar_alerta:
+                alertas.append(msg_alerta)
+    return validador
+
+def _validador_albedo(parametros, erros, alertas):
+    '''Caso especial: dois parâmetros e alerta relacional.'''
+    albedo_original = parametros.get('albedo_original', 0)
+    novo_albedo = parametros.get('novo_albedo', 0)
+
+    if not 0 <= albedo_original <= 1 or not 0 <= novo_albedo <= 1:
+        erros.append("Valores de albedo devem estar entre 0 e 1")
+
+    if novo_albedo < albedo_original:
+        alertas.append("Redução do albedo pode aumentar a temperatura")
+
+_VALIDADORES = {
+    "Parque Urbano": _validador_faixa(
+        'densidade', "Densidade deve estar entre 0 e 1",
+        0.3, "Densidade baixa pode limitar o efeito de resfriamento"),
+    "Alteração de Albedo": _validador_albedo,
+    "Telhado Verde": _validador_faixa(
+        'cobertura', "Cobertura deve estar entre 0 e 1",
+        0.2, "Cobertura verde inferior a 20% pode ter efeito limitado"),
+    "Pavimento Permeável": _validador_faixa(
+        'permeabilidade', "Permeabilidade deve estar entre 0 e 1"),
+    "Expansão Urbana": _validador_faixa(
+        'fator_construcao', "Fator de construção deve estar entre 0 e 1",
+        0.9, "Alta densidade construtiva pode intensificar ilha de calor",
+        alerta_acima=True),
+}
 
 def validar_parametros(tipo, parametros, area_m2):
     '''Valida os parâmetros de entrada e retorna mensagens educativas.'''
     erros = []
     alertas = []
-    
+
     # Validação de área
     if area_m2 <= 0:
         erros.append("Área deve ser maior que zero")
@@ -81,94 +162,127 @@ def validar_parametros(tipo, parametros, area_m2):
         alertas.append("Área muito grande para escala local")
     elif area_m2 < 1000:  # 0.001 km²
         alertas.append("Área muito pequena para impacto significativo")
-    
-    # Validações específicas por tipo
-    if tipo == "Parque Urbano":
-        densidade = parametros.get('densidade', 0)
-        if not 0 <= densidade <= 1:
-            erros.append("Densidade deve estar entre 0 e 1")
-        elif densidade < 0.3:
-            alertas.append("Densidade baixa pode limitar o efeito de resfriamento")
-    
-    elif tipo == "Alteração de Albedo":
-        albedo_original = parametros.get('albedo_original', 0)
-        novo_albedo = parametros.get('novo_albedo', 0)
-        
-        if not 0 <= albedo_original <= 1 or not 0 <= novo_albedo <= 1:
-            erros.append("Valores de albedo devem estar entre 0 e 1")
-        
-        if novo_albedo < albedo_original:
-            alertas.append("Redução do albedo pode aumentar a temperatura")
-    
-    elif tipo == "Telhado Verde":
-        cobertura = parametros.get('cobertura', 0)
-        if not 0 <= cobertura <= 1:
-            erros.append("Cobertura deve estar entre 0 e 1")
-        elif cobertura < 0.2:
-            alertas.append("Cobertura verde inferior a 20% pode ter efeito limitado")
-    
-    elif tipo == "Pavimento Permeável":
-        permeabilidade = parametros.get('permeabilidade', 0)
-        if not 0 <= permeabilidade <= 1:
-            erros.append("Permeabilidade deve estar entre 0 e 1")
-    
-    elif tipo == "Expansão Urbana":
-        fator_construcao = parametros.get('fator_construcao', 0)
-        if not 0 <= fator_construcao <= 1:
-            erros.append("Fator de construção deve estar entre 0 e 1")
-        elif fator_construcao > 0.9:
-            alertas.append("Alta densidade construtiva pode intensificar ilha de calor")
-    
+
+    # Validações específicas por tipo, via tabela de despacho
+    validador = _VALIDADORES.get(tipo)
+    if validador is not None:
+        validador(parametros, erros, alertas)
+
     return erros, alertas
 
 # --- FUNÇÕES DE CÁLCULO MELHORADAS ---
 
+# Coeficientes pré-multiplicados (fator × conversão m²→km²): cada fórmula
+# vira dois ou três multiplies, sem lookup em FATORES_BASE por chamada
+_K_PARQUE = FATORES_BASE["parque_urbano"] * FATOR_AREA
+_K_ALBEDO = FATORES_BASE["alteracao_albedo"] * 10 * FATOR_AREA  # *10: por 0.1 de albedo
+_K_TELHADO = FATORES_BASE["telhado_verde"] * FATOR_AREA
+_K_PAVIMENTO = FATORES_BASE["pavimento_permeavel"] * FATOR_AREA
+_K_EXPANSAO = FATORES_BASE["expansao_urbana"] * FATOR_AREA
+
 def _calcular_impacto_parque(area_m2, densidade):
     '''Calcula o ΔT para um parque urbano com efeito não-linear.'''
-    area_km2 = area_m2 * FATOR_AREA
-    
-    # Efeito não-linear: parques maiores têm maior eficiência
-    fator_eficiencia = min(1.0, 0.5 + (area_km2 * 0.5))  # Limite de eficiência
-    
-    impacto = FATORES_BASE["parque_urbano"] * area_km2 * densidade * fator_eficiencia
-    
+    # Efeito não-linear: parques maiores têm maior eficiência (com limite)
+    fator_eficiencia = min(1.0, 0.5 + area_m2 * FATOR_AREA * 0.5)
+
+    impacto = _K_PARQUE * area_m2 * densidade * fator_eficiencia
+
     # Limitar efeito máximo realisticamente
     return max(impacto, -5.0)  # Máximo de 5°C de resfriamento
 
 def _calcular_impacto_albedo(albedo_original, novo_albedo, area_m2):
     '''Calcula o ΔT para alteração de albedo com escala de área.'''
-    diferenca_albedo = novo_albedo - albedo_original
-    area_km2 = area_m2 * FATOR_AREA
-    
     # Impacto proporcional à diferença de albedo e área
-    impacto = FATORES_BASE["alteracao_albedo"] * diferenca_albedo * 10 * area_km2  # *10 para converter de 0.1
-    
-    return impacto
+    return _K_ALBEDO * (novo_albedo - albedo_original) * area_m2
 
 def _calcular_impacto_telhado_verde(area_m2, cobertura):
     '''Calcula o ΔT para telhados verdes.'''
-    area_km2 = area_m2 * FATOR_AREA
-    return FATORES_BASE["telhado_verde"] * area_km2 * cobertura
+    return _K_TELHADO * area_m2 * cobertura
 
 def _calcular_impacto_pavimento_permeavel(area_m2, permeabilidade):
     '''Calcula o ΔT para pavimentos permeáveis.'''
-    area_km2 = area_m2 * FATOR_AREA
-    
     # Efeito depende da permeabilidade
-    impacto = FATORES_BASE["pavimento_permeavel"] * area_km2 * permeabilidade
-    
-    return impacto
+    return _K_PAVIMENTO * area_m2 * permeabilidade
 
 def _calcular_impacto_expansao_urbana(area_m2, fator_construcao):
     '''Calcula o ΔT para expansão urbana com efeito de saturação.'''
-    area_km2 = area_m2 * FATOR_AREA
-    
     # Efeito de saturação: áreas muito construídas têm impacto relativo menor
     fator_saturacao = 1.0 - (fator_construcao * 0.2)  # Redução de 20% no máximo
-    
-    impacto = FATORES_BASE["expansao_urbana"] * area_km2 * fator_construcao * fator_saturacao
-    
-    return impacto
+
+    return _K_EXPANSAO * area_m2 * fator_construcao * fator_saturacao
+
+# --- NÚCLEO ESCALAR UNIFICADO ---
+
+def _impacto_kernel(tipo_code, area_m2, p0, p1):
+    '''Núcleo escalar das cinco fórmulas de impacto, com assinatura única.
+
+    As constantes de FATORES_BASE aparecem aqui como literais para que o
+    JIT (quando o Numba está presente) possa constant-foldar; qualquer
+    ajuste nos fatores precisa ser replicado neste kernel.
+    '''
+    area_km2 = area_m2 * 1e-6
+    if tipo_code == 0:    # Parque Urbano
+        fator_eficiencia = min(1.0, 0.5 + area_km2 * 0.5)
+        return max(-3.0 * area_km2 * p0 * fator_eficiencia, -5.0)
+    elif tipo_code == 1:  # Alteração de Albedo (p0=original, p1=novo)
+        return -0.6 * (p1 - p0) * 10.0 * area_km2
+    elif tipo_code == 2:  # Telhado Verde
+        return -1.8 * area_km2 * p0
+    elif tipo_code == 3:  # Pavimento Permeável
+        return -1.2 * area_km2 * p0
+    elif tipo_code == 4:  # Expansão Urbana
+        return 2.5 * area_km2 * p0 * (1.0 - p0 * 0.2)
+    return 0.0
+
+if numba is not None:
+    _impacto_kernel = numba.njit(cache=True, fastmath=True)(_impacto_kernel)
+    _impacto_kernel(0, 0.0, 0.0, 0.0)  # aquecimento: compila no import
+
+if numba is not None:
+    @numba.guvectorize(
+        ["(int64, float64[:], float64[:], float64[:], float64[:])"],
+        "(),(n),(n),(n)->(n)", target="parallel", cache=True)
+    def _impacto_lote_gu(tipo_code, areas, p0s, p1s, out):
+        for i in range(areas.shape[0]):
+            out[i] = _impacto_kernel(tipo_code, areas[i], p0s[i], p1s[i])
+
+def _impacto_lote(tipo_code, areas, p0s, p1s):
+    '''Avalia o kernel de impacto para um lote inteiro de cenários.
+
+    Com o Numba presente, a ufunc compilada percorre o lote em paralelo
+    em código nativo; o fallback itera o kernel escalar em Python.
+    '''
+    if numba is not None:
+        return _impacto_lote_gu(tipo_code, areas, p0s, p1s)
+    return np.array([
+        _impacto_kernel(tipo_code, a, b, c)
+        for a, b, c in zip(areas, p0s, p1s)
+    ])
+
+# Posição (p0 ou p1) de cada parâmetro varrível, por código de tipo
+_PARAM_SLOT = {
+    (0, 'densidade'): 0,
+    (1, 'albedo_original'): 0,
+    (1, 'novo_albedo'): 1,
+    (2, 'cobertura'): 0,
+    (3, 'permeabilidade'): 0,
+    (4, 'fator_construcao'): 0,
+}
+
+def _extrair_p0_p1(tipo_code, parametros):
+    '''Extrai os (até dois) parâmetros numéricos do dict, por tipo.'''
+    if tipo_code == 0:
+        return parametros.get('densidade', 0.5), 0.0
+    if tipo_code == 1:
+        return (parametros.get('albedo_original', 0.2),
+                parametros.get('novo_albedo', 0.6))
+    if tipo_code == 2:
+        return parametros.get('cobertura', 0.5), 0.0
+    if tipo_code == 3:
+        return parametros.get('permeabilidade', 0.5), 0.0
+    if tipo_code == 4:
+        return parametros.get('fator_construcao', 0.8), 0.0
+    return 0.0, 0.0
 
 # --- DICIONÁRIO DE FUNÇÕES ATUALIZADO ---
 MAPA_INTERVENCOES = {
@@ -200,30 +314,22 @@ def aplicar_intervencao(tipo, area_m2, parametros, retornar_explicacao=False):
     if erros:
         raise ValueError(f"Erros de validação: {', '.join(erros)}")
     
-    if tipo not in MAPA_INTERVENCOES:
+    code = _TIPO_CODIGO.get(tipo)
+    if code is None:
         raise ValueError(f"Tipo de intervenção desconhecido: {tipo}")
-    
-    funcao_calculo = MAPA_INTERVENCOES[tipo]
-    
+
     try:
-        # Executar cálculo baseado no tipo
-        if tipo == "Parque Urbano":
-            impacto = funcao_calculo(area_m2, parametros.get('densidade', 0.5))
-        elif tipo == "Alteração de Albedo":
-            impacto = funcao_calculo(
-                parametros.get('albedo_original', 0.2), 
-                parametros.get('novo_albedo', 0.6),
-                area_m2
-            )
-        elif tipo == "Telhado Verde":
-            impacto = funcao_calculo(area_m2, parametros.get('cobertura', 0.5))
-        elif tipo == "Pavimento Permeável":
-            impacto = funcao_calculo(area_m2, parametros.get('permeabilidade', 0.5))
-        elif tipo == "Expansão Urbana":
-            impacto = funcao_calculo(area_m2, parametros.get('fator_construcao', 0.8))
-        else:
+        p0, p1 = _extrair_p0_p1(code, parametros)
+
+        # Atalho para o caso nulo — área ou fator multiplicativo zerados
+        # (no albedo, diferença nula): comum em varreduras de borda e
+        # dispensa o despacho do kernel
+        if area_m2 < 1e-9 or (p1 == p0 if code == 1 else p0 == 0.0):
             impacto = 0.0
-        
+        else:
+            # Executar cálculo no núcleo unificado (JIT quando disponível)
+            impacto = float(_impacto_kernel(code, area_m2, p0, p1))
+
         resultado = {
             'impacto': impacto,
             'valido': True,
@@ -244,15 +350,19 @@ def aplicar_intervencao(tipo, area_m2, parametros, retornar_explicacao=False):
             'alertas': alertas
         }
 
-def combinar_intervencoes(lista_intervencoes, pesos=None, retornar_detalhes=True):
+def combinar_intervencoes(lista_intervencoes, pesos=None, retornar_detalhes=True,
+                          retornar_explicacao=False):
     '''
     Calcula o impacto combinado de múltiplas intervenções.
-    
+
     Args:
         lista_intervencoes (list): Lista de intervenções
         pesos (dict): Pesos relativos por tipo
         retornar_detalhes (bool): Se retorna análise detalhada
-    
+        retornar_explicacao (bool): Se inclui o texto educativo em cada
+            detalhe — as f-strings de explicar_impacto só são montadas
+            quando alguém de fato vai lê-las
+
     Returns:
         tuple: (delta_total, resumo_detalhado)
     '''
@@ -262,14 +372,22 @@ def combinar_intervencoes(lista_intervencoes, pesos=None, retornar_detalhes=True
     delta_total = 0.0
     resumo_detalhado = []
     intervencoes_invalidas = []
-    
+
+    # Buffers contíguos preenchidos durante o loop: as agregações finais
+    # saem de reduções NumPy em vez de quatro list comprehensions
+    n = len(lista_intervencoes)
+    imp_buf = np.zeros(n, dtype=np.float64)
+    area_buf = np.zeros(n, dtype=np.float64)
+    valid_mask = np.zeros(n, dtype=np.bool_)
+
     for i, intervencao in enumerate(lista_intervencoes):
         tipo = intervencao.get('tipo', 'Desconhecido')
         area_m2 = intervencao.get('area_m2', 0.0)
         parametros = intervencao.get('parametros', {})
         
         # Aplicar intervenção individual
-        resultado = aplicar_intervencao(tipo, area_m2, parametros, retornar_explicacao=True)
+        resultado = aplicar_intervencao(tipo, area_m2, parametros,
+                                        retornar_explicacao=retornar_explicacao)
         
         if resultado['valido']:
             impacto_individual = resultado['impacto']
@@ -277,7 +395,10 @@ def combinar_intervencoes(lista_intervencoes, pesos=None, retornar_detalhes=True
             impacto_ponderado = impacto_individual * peso
             
             delta_total += impacto_ponderado
-            
+            imp_buf[i] = impacto_ponderado
+            area_buf[i] = resultado.get('area_km2', 0)
+            valid_mask[i] = True
+
             # Detalhes para relatório
             detalhe = {
                 "id": i + 1,
@@ -309,15 +430,16 @@ def combinar_intervencoes(lista_intervencoes, pesos=None, retornar_detalhes=True
         
         resumo_detalhado.append(detalhe)
     
-    # Métadados adicionais para análise
+    # Métadados adicionais para análise (reduções C sobre os buffers,
+    # em vez de re-percorrer a lista de dicts por métrica)
     if retornar_detalhes:
         analise = {
-            'total_intervencoes': len(lista_intervencoes),
-            'intervencoes_validas': len(lista_intervencoes) - len(intervencoes_invalidas),
+            'total_intervencoes': n,
+            'intervencoes_validas': n - len(intervencoes_invalidas),
             'intervencoes_invalidas': len(intervencoes_invalidas),
-            'area_total_km2': sum([d.get('area_km2', 0) for d in resumo_detalhado if d.get('valido', False)]),
-            'impacto_maximo': max([d.get('impacto_ponderado', 0) for d in resumo_detalhado], default=0),
-            'impacto_minimo': min([d.get('impacto_ponderado', 0) for d in resumo_detalhado], default=0)
+            'area_total_km2': float(area_buf[valid_mask].sum()),
+            'impacto_maximo': float(imp_buf.max()) if n > 0 else 0,
+            'impacto_minimo': float(imp_buf.min()) if n > 0 else 0
         }
         
         for detalhe in resumo_detalhado:
@@ -326,6 +448,78 @@ def combinar_intervencoes(lista_intervencoes, pesos=None, retornar_detalhes=True
     
     return delta_total, resumo_detalhado
 
+def combinar_intervencoes_vec(lista_intervencoes, pesos=None):
+    '''
+    Versão vetorizada de combinar_intervencoes (arrays em vez de dicts).
+
+    Converte a lista de intervenções para colunas NumPy (SoA), avalia as
+    cinco fórmulas de impacto como expressões vetorizadas e seleciona o
+    resultado de cada linha pelo código do tipo. Não valida parâmetros
+    nem monta o relatório detalhado — é o caminho rápido para varreduras
+    com muitos cenários.
+
+    Args:
+        lista_intervencoes (list): Lista de intervenções (mesmo formato
+            de combinar_intervencoes)
+        pesos (dict): Pesos relativos por tipo
+
+    Returns:
+        tuple: (delta_total, array de impactos ponderados por intervenção)
+    '''
+    n = len(lista_intervencoes)
+    if n == 0:
+        return 0.0, np.empty(0)
+
+    tipo_code = np.empty(n, dtype=np.int64)
+    area = np.empty(n, dtype=np.float64)
+    p0 = np.zeros(n, dtype=np.float64)
+    p1 = np.zeros(n, dtype=np.float64)
+    peso = np.ones(n, dtype=np.float64)
+
+    for i, intervencao in enumerate(lista_intervencoes):
+        tipo = intervencao.get('tipo', '')
+        code = _TIPO_CODIGO.get(tipo, -1)
+        tipo_code[i] = code
+        area[i] = intervencao.get('area_m2', 0.0)
+        parametros = intervencao.get('parametros', {})
+        if code == 0:
+            p0[i] = parametros.get('densidade', 0.5)
+        elif code == 1:
+            p0[i] = parametros.get('albedo_original', 0.2)
+            p1[i] = parametros.get('novo_albedo', 0.6)
+        elif code == 2:
+            p0[i] = parametros.get('cobertura', 0.5)
+        elif code == 3:
+            p0[i] = parametros.get('permeabilidade', 0.5)
+        elif code == 4:
+            p0[i] = parametros.get('fator_construcao', 0.8)
+        if pesos is not None:
+            peso[i] = pesos.get(tipo, 1.0)
+
+    area_km2 = area * FATOR_AREA
+
+    # As cinco fórmulas de _calcular_impacto_*, em forma fechada sobre os
+    # arrays; np.minimum/np.maximum fazem os clamps sem branches
+    eficiencia = np.minimum(1.0, 0.5 + area_km2 * 0.5)
+    imp_parque = np.maximum(
+        FATORES_BASE["parque_urbano"] * area_km2 * p0 * eficiencia, -5.0
+    )
+    imp_albedo = FATORES_BASE["alteracao_albedo"] * (p1 - p0) * 10 * area_km2
+    imp_telhado = FATORES_BASE["telhado_verde"] * area_km2 * p0
+    imp_pavimento = FATORES_BASE["pavimento_permeavel"] * area_km2 * p0
+    imp_expansao = (
+        FATORES_BASE["expansao_urbana"] * area_km2 * p0 * (1.0 - p0 * 0.2)
+    )
+
+    impactos = np.select(
+        [tipo_code == 0, tipo_code == 1, tipo_code == 2,
+         tipo_code == 3, tipo_code == 4],
+        [imp_parque, imp_albedo, imp_telhado, imp_pavimento, imp_expansao],
+        default=0.0,
+    ) * peso
+
+    return float(impactos.sum()), impactos
+
 # --- FUNÇÕES DE ANÁLISE AVANÇADA ---
 
 def analisar_sensibilidade(tipo_intervencao, parametro, valores, area_base=50000):
@@ -341,29 +535,38 @@ def analisar_sensibilidade(tipo_intervencao, parametro, valores, area_base=50000
     Returns:
         DataFrame: Resultados da análise de sensibilidade
     '''
-    resultados = []
-    
-    for valor in valores:
-        parametros_test = {parametro: valor}
-        
-        try:
-            resultado = aplicar_intervencao(tipo_intervencao, area_base, parametros_test)
-            if resultado['valido']:
-                resultados.append({
-                    'parametro': parametro,
-                    'valor': valor,
-                    'impacto': resultado['impacto'],
-                    'valido': True
-                })
-        except:
-            resultados.append({
-                'parametro': parametro,
-                'valor': valor,
-                'impacto': 0.0,
-                'valido': False
-            })
-    
-    return pd.DataFrame(resultados)
+    import pandas as pd  # import tardio: só as análises precisam do pandas
+
+    valores_np = np.asarray(valores, dtype=np.float64)
+    n = valores_np.shape[0]
+    impactos = np.zeros(n, dtype=np.float64)
+    validos = np.zeros(n, dtype=np.bool_)
+
+    code = _TIPO_CODIGO.get(tipo_intervencao)
+    if code is not None and n > 0:
+        # Pré-validação vetorizada: os parâmetros varridos são frações 0–1,
+        # como em validar_parametros — dispensa o try/except por valor
+        mask = (valores_np >= 0.0) & (valores_np <= 1.0)
+        if mask.any():
+            p0_base, p1_base = _extrair_p0_p1(code, {})
+            p0s = np.full(n, p0_base)
+            p1s = np.full(n, p1_base)
+            slot = _PARAM_SLOT.get((code, parametro))
+            if slot == 0:
+                p0s = valores_np
+            elif slot == 1:
+                p1s = valores_np
+            areas = np.full(n, float(area_base))
+            impactos[mask] = _impacto_lote(code, areas[mask], p0s[mask], p1s[mask])
+            validos[mask] = True
+
+    # Colunas já tipadas: pandas não precisa inferir dtype de dicts
+    return pd.DataFrame({
+        'parametro': np.full(n, parametro, dtype=object),
+        'valor': valores_np,
+        'impacto': impactos,
+        'valido': validos,
+    }, copy=False)
 
 def comparar_estrategias(estrategias):
     '''
@@ -375,25 +578,28 @@ def comparar_estrategias(estrategias):
     Returns:
         DataFrame: Comparação entre estratégias
     '''
-    comparacao = []
-    
-    for nome, intervencoes in estrategias.items():
-        try:
-            delta_total, detalhes = combinar_intervencoes(intervencoes)
-            
-            comparacao.append({
-                'estrategia': nome,
-                'impacto_total': delta_total,
-                'numero_intervencoes': len(intervencoes),
-                'area_total': sum([i.get('area_m2', 0) for i in intervencoes]),
-                'custo_relativo': len(intervencoes) * 0.1,  # Simplificado
-                'eficiencia': delta_total / max(sum([i.get('area_m2', 0) for i in intervencoes]), 1)
-            })
-        except Exception as e:
-            comparacao.append({
-                'estrategia': nome,
-                'impacto_total': 0.0,
-                'erro': str(e)
-            })
-    
-    return pd.DataFrame(comparacao)
\ No newline at end of file
+    import pandas as pd  # import tardio: só as análises precisam do pandas
+
+    # Um único lote vetorizado cobre todas as estratégias: os impactos
+    # saem de combinar_intervencoes_vec e as somas por estratégia de
+    # np.bincount, em vez do loop aninhado estratégia × intervenção
+    nomes = list(estrategias.keys())
+    listas = list(estrategias.values())
+    contagens = np.array([len(lista) for lista in listas], dtype=np.int64)
+    todas = [intervencao for lista in listas for intervencao in lista]
+
+    _, impactos = combinar_intervencoes_vec(todas)
+    areas_m2 = np.array([i.get('area_m2', 0) for i in todas], dtype=np.float64)
+
+    ids = np.repeat(np.arange(len(nomes)), contagens)
+    impacto_total = np.bincount(ids, weights=impactos, minlength=len(nomes))
+    area_total = np.bincount(ids, weights=areas_m2, minlength=len(nomes))
+
+    return pd.DataFrame({
+        'estrategia': np.array(nomes, dtype=object),
+        'impacto_total': impacto_total,
+        'numero_intervencoes': contagens,
+        'area_total': area_total,
+        'custo_relativo': contagens * 0.1,  # Simplificado
+        'eficiencia': impacto_total / np.maximum(area_total, 1)
+    }, copy=False)
\ No newline at end of file